@@ -4,8 +4,10 @@ PyInstaller spec file for PLY to COLMAP Converter
 Portable standalone executable for Windows 10/11
 """
 
+import os
 import sys
 from pathlib import Path
+from PyInstaller import __version__ as pyinstaller_version
 
 block_cipher = None
 
@@ -37,6 +39,19 @@ hiddenimports = [
     'Shramko_Andrii_ply_to_colmap_converter',
 ]
 
+# Modules to leave out, set by build_portable.py (--slim)
+excludes = [m for m in os.environ.get('PLY_CONVERTER_EXCLUDES', '').split(',') if m]
+if excludes:
+    # PyInstaller appends __main__ to a non-empty list in place, which would
+    # make it look changed on every run and defeat reuse of build/
+    excludes.append('__main__')
+
+# Bundle bytecode compiled as with python -OO (no asserts or docstrings:
+# smaller archive, faster module loading); supported since PyInstaller 6.0
+analysis_options = {}
+if int(pyinstaller_version.split('.')[0]) >= 6:
+    analysis_options['optimize'] = 2
+
 a = Analysis(
     ['gui_converter.py'],
     pathex=[str(current_dir)],
@@ -46,11 +61,12 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=excludes,
     win_no_prefer_redirects=False,
     win_private_assemblies=False,
     cipher=block_cipher,
     noarchive=False,
+    **analysis_options,
 )
 
 pyz = PYZ(a.pure, a.zipped_data, cipher=block_cipher)
@@ -66,8 +82,12 @@ exe = EXE(
     debug=False,
     bootloader_ignore_signals=False,
     strip=False,
-    upx=True,
-    upx_exclude=[],
+    upx=os.environ.get('PLY_CONVERTER_UPX', '1') == '1',  # build_portable.py --no-upx turns it off
+    upx_exclude=[
+        'vcruntime140.dll',
+        'python3.dll',
+        f'python{sys.version_info.major}{sys.version_info.minor}.dll',
+    ],
     runtime_tmpdir=None,
     console=False,  # No console window
     disable_windowed_traceback=False,
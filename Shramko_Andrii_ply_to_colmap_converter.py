@@ -16,10 +16,104 @@ License: MIT - Free for community use
 
 import os
 import sys
+import math
 import argparse
 import struct
+import heapq
+import queue
+import shutil
+import tempfile
+import threading
+import multiprocessing
+from operator import itemgetter
+from array import array
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
+try:
+    import numpy as np
+except ImportError:
+    # numpy is optional - without it the pure Python parser is used
+    np = None
+
+try:
+    from numba import njit, prange
+except ImportError:
+    # numba is optional - without it duplicates are removed with np.unique
+    njit = None
+
+try:
+    import _ply_core
+except ImportError:
+    # Optional Cython kernels, see _ply_core.pyx
+    _ply_core = None
+
+try:
+    import pyminiply
+except ImportError:
+    # pyminiply is optional - native (C++) reader for float32/uchar binary PLY files
+    pyminiply = None
+
+try:
+    import cupy as cp
+except ImportError:
+    # cupy is optional - only needed for --gpu
+    cp = None
+
+# Write buffer for points3D.txt (outputs can be tens of millions of lines)
+OUTPUT_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Number of vertices read per batch by the pure Python binary reader
+READ_BATCH_VERTICES = 1 << 16
+
+# One points3D.txt line: POINT3D_ID X Y Z R G B ERROR (empty track), with
+# each coordinate given as sign, integer part and 6-digit fraction
+COLMAP_FIXED_POINT_LINE = "%d %s%d.%06d %s%d.%06d %s%d.%06d %d %d %d 0\n"
+
+# Shifts quantized coordinates and colors into unsigned 64-bit lanes of a packed dedup key
+KEY_LANE_OFFSET = 1 << 63
+
+# Fields of the sortable point records used by np.unique and chunked mode
+# (quantized coordinates, then the colors at full width)
+POINT_RECORD_FIELDS = [('x', '<i8'), ('y', '<i8'), ('z', '<i8'), ('r', '<i8'), ('g', '<i8'), ('b', '<i8')]
+
+# Quantized value of coordinates that print as -0.000000, kept apart from 0
+NEGATIVE_ZERO = -(1 << 63)
+
+# Pure Python dedup keys use round(x * 1e6) unless a product is this close
+# to a .5 tie or this large (in 1e-6 units), where it may round differently
+# from f"{x:.6f}" and quantize_value is used instead
+ROUNDING_MARGIN = 0.495
+FAST_ROUNDING_LIMIT = 1 << 45
+
+# Vertices with a coordinate that is NaN, infinite or at least this large
+# (in magnitude) do not fit in 64-bit 1e-6 units and are skipped
+MAX_COORDINATE = 9e12
+
+# PLY property types mapped to struct format characters
+STRUCT_TYPES = {
+    'float': 'f', 'float32': 'f',
+    'double': 'd', 'float64': 'd',
+    'uchar': 'B', 'uint8': 'B',
+    'char': 'b', 'int8': 'b',
+    'ushort': 'H', 'uint16': 'H',
+    'short': 'h', 'int16': 'h',
+    'uint': 'I', 'uint32': 'I',
+    'int': 'i', 'int32': 'i',
+}
+
+# PLY property types mapped to numpy dtype codes (byte order is added per file)
+NUMPY_TYPES = {
+    'float': 'f4', 'float32': 'f4',
+    'double': 'f8', 'float64': 'f8',
+    'uchar': 'u1', 'uint8': 'u1',
+    'char': 'i1', 'int8': 'i1',
+    'ushort': 'u2', 'uint16': 'u2',
+    'short': 'i2', 'int16': 'i2',
+    'uint': 'u4', 'uint32': 'u4',
+    'int': 'i4', 'int32': 'i4',
+}
+
 def read_ply_header(file_handle):
     """Reads PLY file header and returns metadata"""
     format_type = None
@@ -52,7 +146,7 @@ def read_ply_header(file_handle):
             parts = line.split()
             if len(parts) >= 3:
                 prop_type = parts[1]
-                prop_name = parts[2]
+                prop_name = parts[2].lower()  # Property names are matched case-insensitively
                 vertex_properties.append((prop_type, prop_name))
         
         elif line == 'end_header':
@@ -67,52 +161,571 @@ def read_ply_header(file_handle):
     }
 
 def find_property_index(properties, name):
-    """Finds index of property by name"""
+    """Finds index of property by (lowercase) name"""
     for i, (prop_type, prop_name) in enumerate(properties):
-        if prop_name.lower() == name.lower():
+        if prop_name == name:
             return i, prop_type
     return None, None
 
-def parse_binary_vertex(data, properties, byte_order='<'):
-    """Parses a single vertex from binary PLY data"""
-    vertex_data = {}
-    offset = 0
-    
-    for prop_type, prop_name in properties:
-        if prop_type == 'float' or prop_type == 'float32':
-            value = struct.unpack(f'{byte_order}f', data[offset:offset+4])[0]
-            offset += 4
-        elif prop_type == 'double' or prop_type == 'float64':
-            value = struct.unpack(f'{byte_order}d', data[offset:offset+8])[0]
-            offset += 8
-        elif prop_type == 'uchar' or prop_type == 'uint8':
-            value = struct.unpack('B', data[offset:offset+1])[0]
-            offset += 1
-        elif prop_type == 'ushort' or prop_type == 'uint16':
-            value = struct.unpack(f'{byte_order}H', data[offset:offset+2])[0]
-            offset += 2
-        elif prop_type == 'uint' or prop_type == 'uint32':
-            value = struct.unpack(f'{byte_order}I', data[offset:offset+4])[0]
-            offset += 4
-        elif prop_type == 'char' or prop_type == 'int8':
-            value = struct.unpack('b', data[offset:offset+1])[0]
-            offset += 1
-        elif prop_type == 'short' or prop_type == 'int16':
-            value = struct.unpack(f'{byte_order}h', data[offset:offset+2])[0]
-            offset += 2
-        elif prop_type == 'int' or prop_type == 'int32':
-            value = struct.unpack(f'{byte_order}i', data[offset:offset+4])[0]
-            offset += 4
-        else:
-            # Default to float32 if unknown
-            value = struct.unpack(f'{byte_order}f', data[offset:offset+4])[0]
-            offset += 4
+def find_color_indices(properties):
+    """Finds indices of the color properties (can be red/green/blue or r/g/b)"""
+    indices = []
+    for name, short_name in (('red', 'r'), ('green', 'g'), ('blue', 'b')):
+        idx, _ = find_property_index(properties, name)
+        if idx is None:
+            idx, _ = find_property_index(properties, short_name)
+        indices.append(idx)
+    return tuple(indices)
+
+def prefetch(iterable, depth=2):
+    """
+    Iterates over iterable in a background thread, keeping up to depth items
+    ready. File reads and most numpy work release the GIL, so producing the
+    next item overlaps with processing the current one.
+    """
+    items = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    done = object()
+    
+    def produce():
+        try:
+            for item in iterable:
+                while not stop.is_set():
+                    try:
+                        items.put((item, None), timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+                if stop.is_set():
+                    return
+            items.put((done, None))
+        except BaseException as e:
+            items.put((done, e))
+    
+    producer = threading.Thread(target=produce, daemon=True)
+    producer.start()
+    try:
+        while True:
+            item, error = items.get()
+            if error is not None:
+                raise error
+            if item is done:
+                return
+            yield item
+    finally:
+        stop.set()
+
+def read_vertex_batches(ply_file, header_info, vertex_size):
+    """Yields the binary vertex data in blocks of whole vertices"""
+    vertex_count = header_info['vertex_count']
+    
+    with open(ply_file, 'rb') as f:
+        f.seek(header_info['data_start'])  # Skip to data section
+        
+        # Read vertices in batches to amortize read calls
+        processed = 0
+        while processed < vertex_count:
+            batch = min(READ_BATCH_VERTICES, vertex_count - processed)
+            data = f.read(vertex_size * batch)
+            complete = len(data) // vertex_size
+            if complete == 0:
+                break
+            
+            yield data[:complete * vertex_size]
+            
+            processed += complete
+            if complete < batch:
+                break  # Truncated file
+
+def read_binary_vertices(ply_file, header_info, byte_order, coord_indices, color_indices):
+    """Yields (x, y, z, r, g, b) tuples from binary PLY data (pure Python fallback)"""
+    x_idx, y_idx, z_idx = coord_indices
+    r_idx, g_idx, b_idx = color_indices
+    
+    # The property layout is fixed per file, so one precompiled Struct
+    # decodes a whole vertex into a tuple (unknown types default to float32)
+    vertex_struct = struct.Struct(byte_order + ''.join(
+        STRUCT_TYPES.get(prop_type, 'f') for prop_type, _ in header_info['properties']
+    ))
+    vertex_size = vertex_struct.size
+    batches = prefetch(read_vertex_batches(ply_file, header_info, vertex_size))
+    
+    # Integer colors need no conversion, so the six values are picked out
+    # of each vertex by a single itemgetter without any Python-level code
+    properties = header_info['properties']
+    if None not in color_indices and all(STRUCT_TYPES.get(properties[i][0], 'f') not in 'fd' for i in color_indices):
+        select = itemgetter(x_idx, y_idx, z_idx, r_idx, g_idx, b_idx)
+        for data in batches:
+            yield from map(select, vertex_struct.iter_unpack(data))
+        return
+    
+    # Batches are read ahead in a background thread while this one decodes
+    for data in batches:
+        for values in vertex_struct.iter_unpack(data):
+            # Missing color channels default to gray
+            r = int(values[r_idx]) if r_idx is not None else 128
+            g = int(values[g_idx]) if g_idx is not None else 128
+            b = int(values[b_idx]) if b_idx is not None else 128
+            
+            yield values[x_idx], values[y_idx], values[z_idx], r, g, b
+
+def read_ascii_vertices(ply_file, header_info, coord_indices, color_indices):
+    """Yields (x, y, z, r, g, b) tuples from ASCII PLY data (pure Python fallback)"""
+    vertex_count = header_info['vertex_count']
+    x_idx, y_idx, z_idx = coord_indices
+    r_idx, g_idx, b_idx = color_indices
+    
+    # Lines are parsed as bytes (float() accepts them), so the header is
+    # skipped with a seek instead of being decoded and scanned a second time
+    with open(ply_file, 'rb') as f:
+        f.seek(header_info['data_start'])  # Skip to data section
+        
+        # Now read vertex data (other elements such as faces may follow it)
+        lines_read = 0
+        for line in f:
+            line = line.strip()
+            if not line:
+                continue
+            
+            lines_read += 1
+            if lines_read > vertex_count:
+                break
+            
+            parts = line.split()
+            if len(parts) < max(x_idx, y_idx, z_idx) + 1:
+                continue
+            
+            try:
+                x, y, z = float(parts[x_idx]), float(parts[y_idx]), float(parts[z_idx])
+                
+                if r_idx is not None and len(parts) > max(r_idx, g_idx, b_idx):
+                    r, g, b = int(float(parts[r_idx])), int(float(parts[g_idx])), int(float(parts[b_idx]))
+                else:
+                    r, g, b = 128, 128, 128  # Default gray
+            except (ValueError, IndexError):
+                continue  # Skip invalid lines
+            
+            yield x, y, z, r, g, b
+
+def load_ascii_vertices(ply_file, header_info, coord_indices, color_indices):
+    """
+    Loads ASCII PLY vertices with numpy
+    
+    Returns:
+        tuple: (xyz, rgb) arrays, or None if the data contains lines
+        numpy cannot parse and has to go through read_ascii_vertices
+    """
+    has_colors = color_indices[0] is not None
+    columns = coord_indices + (color_indices if has_colors else ())
+    
+    with open(ply_file, 'rb') as f:
+        f.seek(header_info['data_start'])  # Skip to data section
+        try:
+            data = np.loadtxt(f, usecols=columns, max_rows=header_info['vertex_count'], ndmin=2)
+        except (ValueError, IndexError):
+            return None
+    
+    xyz = data[:, :3]
+    if has_colors:
+        rgb = data[:, 3:].astype(np.int64)
+    else:
+        rgb = np.full((len(data), 3), 128, dtype=np.int64)  # Default gray
+    return xyz, rgb
+
+def map_binary_vertices(ply_file, header_info, byte_order):
+    """
+    Memory-maps the binary vertex block as a read-only structured array
+    (one field per property); pages are brought in by the OS as it is read
+    """
+    vertex_dtype = np.dtype([
+        (prop_name, byte_order + NUMPY_TYPES.get(prop_type, 'f4'))
+        for prop_type, prop_name in header_info['properties']
+    ])
+    data_size = os.path.getsize(ply_file) - header_info['data_start']
+    count = min(header_info['vertex_count'], max(data_size, 0) // vertex_dtype.itemsize)
+    if count == 0:
+        return np.empty(0, dtype=vertex_dtype)
+    return np.memmap(ply_file, dtype=vertex_dtype, mode='r',
+                     offset=header_info['data_start'], shape=(count,))
+
+def vertex_columns(vertices, coord_names, color_names):
+    """Extracts (xyz, rgb) arrays from structured vertices, missing colors become gray"""
+    xyz = np.column_stack([vertices[name] for name in coord_names])
+    rgb = np.column_stack([
+        vertices[name].astype(np.int64) if name is not None else np.full(len(vertices), 128, dtype=np.int64)
+        for name in color_names
+    ])
+    return xyz, rgb
+
+def load_binary_vertices(ply_file, header_info, byte_order, coord_names, color_names):
+    """Loads binary PLY vertices with numpy, returns (xyz, rgb) arrays"""
+    vertices = map_binary_vertices(ply_file, header_info, byte_order)
+    return vertex_columns(vertices, coord_names, color_names)
+
+def load_native_vertices(ply_file, header_info, coord_names, color_names):
+    """
+    Loads binary PLY vertices with the pyminiply C++ reader
+    
+    pyminiply always returns float32 coordinates and uchar colors, so it is
+    only used for files that store exactly those (as x/y/z and red/green/blue);
+    its result is then the same as that of load_binary_vertices.
+    
+    Returns:
+        tuple: (xyz, rgb) arrays, or None if the file has to be read with
+        load_binary_vertices instead
+    """
+    types = {name: prop_type for prop_type, name in header_info['properties']}
+    has_colors = None not in color_names
+    if tuple(coord_names) != ('x', 'y', 'z') or any(types[name] not in ('float', 'float32') for name in coord_names):
+        return None
+    if has_colors and (tuple(color_names) != ('red', 'green', 'blue')
+                       or any(types[name] not in ('uchar', 'uint8') for name in color_names)):
+        return None
+    if not has_colors and any(name is not None for name in color_names):
+        return None  # Partial colors: missing channels become gray in vertex_columns
+    
+    try:
+        xyz, _, _, _, color = pyminiply.read(str(ply_file), read_normals=False, read_uv=False,
+                                             read_color=has_colors)
+    except (RuntimeError, ValueError, OSError):
+        return None
+    
+    vertex_count = header_info['vertex_count']
+    if xyz is None or len(xyz) != vertex_count or (has_colors and len(color) != vertex_count):
+        return None  # Unreadable or truncated file
+    
+    if has_colors:
+        rgb = color.astype(np.int64)
+    else:
+        rgb = np.full((len(xyz), 3), 128, dtype=np.int64)  # Default gray
+    return xyz, rgb
+
+if np is not None and njit is not None:
+    @njit(parallel=True, cache=True)
+    def _hash_points(qxyz, rgb):
+        """Computes a 64-bit FNV-1a hash of every quantized point"""
+        n = qxyz.shape[0]
+        hashes = np.empty(n, dtype=np.uint64)
+        for i in prange(n):
+            h = np.uint64(14695981039346656037)
+            for j in range(3):
+                h = (h ^ np.uint64(qxyz[i, j])) * np.uint64(1099511628211)
+            for j in range(3):
+                h = (h ^ np.uint64(rgb[i, j])) * np.uint64(1099511628211)
+            hashes[i] = h
+        return hashes
+    
+    @njit(cache=True)
+    def _first_occurrence_mask(qxyz, rgb):
+        """Marks the first occurrence of every point using an open-addressing hash table"""
+        n = qxyz.shape[0]
+        hashes = _hash_points(qxyz, rgb)
+        size = 1
+        while size < 2 * n:
+            size <<= 1
+        slot_mask = np.uint64(size - 1)
+        table = np.full(size, -1, dtype=np.int64)
+        keep = np.zeros(n, dtype=np.bool_)
+        
+        # Insertion stays sequential so the earliest index of each point wins
+        for i in range(n):
+            slot = np.int64(hashes[i] & slot_mask)
+            while True:
+                k = table[slot]
+                if k == -1:
+                    table[slot] = i
+                    keep[i] = True
+                    break
+                if (hashes[k] == hashes[i]
+                        and qxyz[k, 0] == qxyz[i, 0] and qxyz[k, 1] == qxyz[i, 1] and qxyz[k, 2] == qxyz[i, 2]
+                        and rgb[k, 0] == rgb[i, 0] and rgb[k, 1] == rgb[i, 1] and rgb[k, 2] == rgb[i, 2]):
+                    break
+                slot = (slot + 1) & (size - 1)
+        return keep
+else:
+    _first_occurrence_mask = None
+
+def pack_point_records(qxyz, rgb):
+    """Packs quantized points into a sortable structured array (see POINT_RECORD_FIELDS)"""
+    records = np.empty(len(qxyz), dtype=POINT_RECORD_FIELDS)
+    for i, axis in enumerate('xyz'):
+        records[axis] = qxyz[:, i]
+    for i, channel in enumerate('rgb'):
+        records[channel] = rgb[:, i]
+    return records
+
+def unpack_point_records(records):
+    """Inverse of pack_point_records, returns (qxyz, rgb) arrays"""
+    qxyz = np.column_stack([records['x'], records['y'], records['z']])
+    rgb = np.column_stack([records['r'], records['g'], records['b']])
+    return qxyz, rgb
+
+def quantize_value(value):
+    """
+    Converts one coordinate to integer 1e-6 units exactly as f"{value:.6f}"
+    rounds it; -0.000000 becomes NEGATIVE_ZERO
+    """
+    q = int(f"{value:.6f}".replace('.', ''))
+    if q == 0 and math.copysign(1.0, value) < 0:
+        return NEGATIVE_ZERO
+    return q
+
+def finite_vertices(xyz, rgb):
+    """
+    Drops vertices with a NaN, infinite or out of range coordinate (see
+    MAX_COORDINATE), which quantize_coordinates cannot represent
+    
+    Returns:
+        tuple: (xyz, rgb, number of vertices dropped)
+    """
+    valid = (np.abs(xyz) < MAX_COORDINATE).all(axis=1)
+    dropped = len(valid) - int(np.count_nonzero(valid))
+    if dropped:
+        xyz, rgb = xyz[valid], rgb[valid]
+    return xyz, rgb, dropped
+
+def quantize_coordinates(xyz):
+    """
+    Converts coordinates to integer 1e-6 units - the 6 decimals written to
+    points3D.txt. The result is used both as dedup key and for output.
+    
+    Matches f"{x:.6f}" digit for digit: x * 1e6 is off by at most half an
+    ulp, so np.rint can only round differently from the exact decimal value
+    when the product lies within an ulp of a .5 tie. Those (rare) elements
+    are re-resolved with quantize_value. Coordinates must be finite and
+    below MAX_COORDINATE (see finite_vertices).
+    """
+    scaled = np.multiply(xyz, 1e6, dtype=np.float64)
+    rounded = np.rint(scaled)
+    qxyz = rounded.astype(np.int64)
+    near_tie = np.abs(np.abs(scaled - rounded) - 0.5) <= np.spacing(np.abs(scaled))
+    for index in zip(*np.nonzero(near_tie)):
+        qxyz[index] = quantize_value(float(xyz[index]))
+    qxyz[(qxyz == 0) & np.signbit(xyz)] = NEGATIVE_ZERO
+    return qxyz
+
+def unique_vertices(qxyz, rgb):
+    """
+    Removes duplicate points with numpy, keeping the first occurrence of each
+    
+    Points are compared on quantized coordinates (see quantize_coordinates)
+    together with their colors. Uses a compiled hash table when numba or the
+    _ply_core extension is available, np.unique otherwise.
+    """
+    if _first_occurrence_mask is not None:
+        first = np.flatnonzero(_first_occurrence_mask(qxyz, rgb.astype(np.int64, copy=False)))
+    elif _ply_core is not None:
+        keep = _ply_core.first_occurrence_mask(qxyz, np.ascontiguousarray(rgb, dtype=np.int64))
+        first = np.flatnonzero(np.frombuffer(keep, dtype=np.bool_))
+    else:
+        _, first = np.unique(pack_point_records(qxyz, rgb), return_index=True)
+        first.sort()  # Keep the original point order
+    
+    return qxyz[first], rgb[first]
+
+def unique_vertices_gpu(qxyz, rgb):
+    """
+    Removes duplicate points on a CUDA GPU with cupy, keeping the first
+    occurrence of each (same result as unique_vertices)
+    
+    The points are sorted on the device by (x, y, z, r, g, b, index); the
+    first point of every run of equal values is its first occurrence.
+    """
+    n = len(qxyz)
+    if n == 0:
+        return qxyz, rgb
+    
+    points = cp.asarray(np.column_stack((qxyz, rgb)))
+    # cp.lexsort uses the last key as the primary one
+    order = cp.lexsort(cp.vstack((cp.arange(n, dtype=cp.int64), points.T[::-1])))
+    ordered = points[order]
+    starts = cp.empty(n, dtype=cp.bool_)
+    starts[0] = True
+    cp.any(ordered[1:] != ordered[:-1], axis=1, out=starts[1:])
+    first = cp.asnumpy(cp.sort(order[starts]))  # Keep the original point order
+    
+    return qxyz[first], rgb[first]
+
+def write_colmap_points(f, qxyz, rgb, first_id=1, chunk_size=100000):
+    """
+    Writes numpy point arrays as COLMAP points3D.txt lines
+    
+    Coordinates are quantized integers (see quantize_coordinates) and are
+    printed as fixed-point decimals, so no float formatting is involved.
+    
+    COLMAP format: POINT3D_ID X Y Z R G B ERROR TRACK[]
+    For dense cloud: ERROR = 0, TRACK[] is empty
+    """
+    for start in range(0, len(qxyz), chunk_size):
+        end = min(start + chunk_size, len(qxyz))
+        if _ply_core is not None:
+            f.write(_ply_core.format_points(
+                np.ascontiguousarray(qxyz[start:end]),
+                np.ascontiguousarray(rgb[start:end], dtype=np.int64),
+                first_id + start,
+            ))
+            continue
+        
+        # One %-format over the whole chunk runs the formatting loop in C;
+        # each coordinate becomes (sign, integer part, 6-digit fraction)
+        chunk = qxyz[start:end]
+        magnitude = np.where(chunk == NEGATIVE_ZERO, 0, np.abs(chunk))
+        rows = np.empty((end - start, 13), dtype=object)
+        rows[:, 0] = np.arange(first_id + start, first_id + end)
+        rows[:, 1:10:3] = np.where(chunk < 0, '-', '')
+        rows[:, 2:10:3] = magnitude // 1000000
+        rows[:, 3:10:3] = magnitude % 1000000
+        rows[:, 10:] = rgb[start:end]
+        text = (COLMAP_FIXED_POINT_LINE * (end - start)) % tuple(rows.ravel().tolist())
+        f.write(text.encode('ascii'))
+
+def make_log(log_callback=None):
+    """
+    Returns a print-like function for converter messages
+    
+    Messages are printed to stdout, or passed to log_callback (one call per
+    message, newline included) if it is given.
+    """
+    if log_callback is None:
+        return print
+    
+    def log(message=""):
+        log_callback(f"{message}\n")
+    return log
+
+def report_progress(processed, vertex_count, unique, progress_callback=None, log=print):
+    """Logs a progress line and passes the same numbers to progress_callback (if given)"""
+    progress = (processed / vertex_count) * 100 if vertex_count > 0 else 100
+    log(f"Progress: {progress:.1f}% - Processed: {processed:,}, Unique: {unique:,}")
+    if progress_callback is not None:
+        progress_callback(progress, processed, vertex_count, unique)
+
+def dedup_vertex_range(ply_file, header_info, byte_order, coord_names, color_names, start, stop):
+    """
+    Worker for dedup_binary_parallel: deduplicates vertices [start, stop)
+    through its own memory map, so no vertex data is sent between processes
+    
+    Returns:
+        tuple: (qxyz, rgb) unique points and the number of vertices skipped
+    """
+    vertices = map_binary_vertices(ply_file, header_info, byte_order)[start:stop]
+    xyz, rgb, skipped = finite_vertices(*vertex_columns(vertices, coord_names, color_names))
+    return unique_vertices(quantize_coordinates(xyz), rgb), skipped
+
+def dedup_binary_parallel(ply_file, header_info, byte_order, coord_names, color_names, workers,
+                          progress_callback=None, log=print):
+    """
+    Removes duplicates from a binary PLY using several processes
+    
+    The vertex block is split into one contiguous range per worker; each
+    worker deduplicates its range, and a final pass over the concatenated
+    (much smaller) results removes duplicates found in different ranges.
+    Ranges are concatenated in file order, so the result is identical to
+    unique_vertices over the whole file.
+    
+    Workers are started with the "spawn" method: forking after numba has
+    started its threads can deadlock the children and hang the interpreter
+    at exit. More workers than CPUs are never started.
+    
+    Returns:
+        tuple: (qxyz, rgb) unique points, the number of vertices read and
+            the number of vertices skipped (see finite_vertices)
+    """
+    vertex_count = len(map_binary_vertices(ply_file, header_info, byte_order))
+    workers = min(workers, os.cpu_count() or 1)
+    bounds = [vertex_count * i // workers for i in range(workers + 1)]
+    
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as executor:
+        futures = [
+            executor.submit(dedup_vertex_range, ply_file, header_info, byte_order,
+                            coord_names, color_names, start, stop)
+            for start, stop in zip(bounds, bounds[1:])
+        ]
+        parts = []
+        skipped = 0
+        for i, future in enumerate(futures, 1):
+            part, part_skipped = future.result()
+            parts.append(part)
+            skipped += part_skipped
+            unique = sum(len(qxyz) for qxyz, _ in parts)
+            report_progress(bounds[i], vertex_count, unique, progress_callback, log)
+    
+    qxyz = np.concatenate([qxyz for qxyz, _ in parts])
+    rgb = np.concatenate([rgb for _, rgb in parts])
+    return unique_vertices(qxyz, rgb), vertex_count, skipped
+
+def iter_point_records(path, block_size=65536):
+    """Yields the records of a sorted chunk file as tuples, one block in memory at a time"""
+    records = np.load(path, mmap_mode='r')
+    for start in range(0, len(records), block_size):
+        yield from records[start:start + block_size].tolist()
+    del records
+
+def dedup_binary_chunked(ply_file, header_info, byte_order, coord_names, color_names, chunk_size, work_dir,
+                         progress_callback=None, log=print):
+    """
+    Removes duplicates from a binary PLY in bounded memory
+    
+    Each chunk of chunk_size vertices is deduplicated and sorted on its own
+    and saved to work_dir; the sorted chunks are then merged and equal
+    records dropped. Only one chunk (plus a block per chunk file during the
+    merge) is held in memory, so clouds larger than RAM can be processed.
+    Points come out sorted by coordinates rather than in file order.
+    
+    Returns:
+        tuple: (numpy.memmap, int) unique point records (see
+            pack_point_records) and the number of vertices skipped (see
+            finite_vertices)
+    """
+    vertices = map_binary_vertices(ply_file, header_info, byte_order)
+    vertex_count = len(vertices)
+    
+    def read_chunks():
+        for start in range(0, vertex_count, chunk_size):
+            chunk = vertices[start:start + chunk_size]
+            yield (start,) + vertex_columns(chunk, coord_names, color_names)
+    
+    chunk_files = []
+    chunk_unique = 0
+    skipped = 0
+    # The next chunk is paged in from disk while the current one is deduplicated
+    for start, xyz, rgb in prefetch(read_chunks()):
+        xyz, rgb, chunk_skipped = finite_vertices(xyz, rgb)
+        skipped += chunk_skipped
+        records = pack_point_records(*unique_vertices(quantize_coordinates(xyz), rgb))
+        records.sort()
+        
+        chunk_path = os.path.join(work_dir, f"chunk_{len(chunk_files):05d}.npy")
+        np.save(chunk_path, records)
+        chunk_files.append(chunk_path)
+        chunk_unique += len(records)
         
-        vertex_data[prop_name] = value
+        report_progress(min(start + chunk_size, vertex_count), vertex_count, chunk_unique, progress_callback, log)
+    del vertices
+    
+    log(f"Merging {len(chunk_files)} sorted chunks...")
+    merged_path = os.path.join(work_dir, "merged.bin")
+    record_dtype = np.dtype(POINT_RECORD_FIELDS)
+    with open(merged_path, 'wb') as f:
+        previous = None
+        batch = []
+        for record in heapq.merge(*[iter_point_records(path) for path in chunk_files]):
+            if record == previous:
+                continue
+            previous = record
+            batch.append(record)
+            if len(batch) >= 65536:
+                np.array(batch, dtype=record_dtype).tofile(f)
+                batch = []
+        if batch:
+            np.array(batch, dtype=record_dtype).tofile(f)
     
-    return vertex_data, offset
+    if os.path.getsize(merged_path) == 0:
+        return np.empty(0, dtype=record_dtype), skipped
+    return np.memmap(merged_path, dtype=record_dtype, mode='r'), skipped
 
-def convert_ply_to_colmap(ply_file, output_file=None):
+def convert_ply_to_colmap(ply_file, output_file=None, chunk_size=None, workers=None, gpu=False, dedup=True,
+                          progress_callback=None, stats=None, log_callback=None):
     """
     Convert PLY file to COLMAP points3D.txt format
     Supports both ASCII and binary PLY formats
@@ -120,35 +733,78 @@ def convert_ply_to_colmap(ply_file, output_file=None):
     Args:
         ply_file (str): Path to input PLY file
         output_file (str): Path to output COLMAP file (optional)
+        chunk_size (int): Process binary PLY files in chunks of this many
+            vertices with bounded memory (optional, requires numpy)
+        workers (int): Remove duplicates from binary PLY files in this many
+            processes (optional, requires numpy)
+        gpu (bool): Remove duplicates on a CUDA GPU (optional, requires cupy;
+            not used with chunk_size or workers)
+        dedup (bool): Remove duplicate points (default: True); disable for
+            clouds that are known to be unique to write every vertex as is
+        progress_callback (callable): Called as progress_callback(percent,
+            processed, total, unique) whenever progress is printed (optional)
+        stats (dict): Receives "points_count", the number of points written,
+            and "output_size", the output file size in bytes, on success
+            (optional)
+        log_callback (callable): Receives every output line (newline
+            included) instead of it being printed to stdout (optional)
+    
+    Returns:
+        bool: True if conversion succeeded, False otherwise
+    
+    Raises:
+        ValueError: If chunk_size or workers is given and not positive
     """
     
+    if chunk_size is not None and chunk_size <= 0:
+        raise ValueError(f"chunk_size must be a positive number of vertices, got {chunk_size}")
+    if workers is not None and workers <= 0:
+        raise ValueError(f"workers must be a positive number of processes, got {workers}")
+    
+    log = make_log(log_callback)
+    
     # Set default output file if not provided
     if output_file is None:
         ply_path = Path(ply_file)
         output_file = ply_path.parent / "points3D.txt"
     
-    print("=" * 60)
-    print("PLY to COLMAP Converter for Postshot")
-    print("Community contribution to 3D/4D Gaussian Splatting")
-    print("=" * 60)
-    print(f"Input file: {ply_file}")
-    print(f"Output file: {output_file}")
-    print()
-    
-    # Check if input file exists
-    if not os.path.exists(ply_file):
-        print(f"ERROR: Input file '{ply_file}' not found!")
+    log("=" * 60)
+    log("PLY to COLMAP Converter for Postshot")
+    log("Community contribution to 3D/4D Gaussian Splatting")
+    log("=" * 60)
+    log(f"Input file: {ply_file}")
+    log(f"Output file: {output_file}")
+    log()
+    
+    if not dedup:
+        # Chunking, worker processes and the GPU are only used for duplicate removal
+        chunk_size = workers = None
+        gpu = False
+    if chunk_size and np is None:
+        log("WARNING: Chunked processing requires numpy, converting in memory")
+    if workers and workers > 1 and np is None:
+        log("WARNING: Parallel processing requires numpy, using a single process")
+    if gpu and (np is None or cp is None):
+        log("WARNING: GPU processing requires numpy and cupy, removing duplicates on the CPU")
+        gpu = False
+    
+    # Check if input file exists (its size is reported at the end)
+    try:
+        input_stat = os.stat(ply_file)
+    except OSError:
+        log(f"ERROR: Input file '{ply_file}' not found!")
         return False
     
+    work_dir = None
     try:
         # Detect file format by reading header
-        print("Reading PLY file header...")
+        log("Reading PLY file header...")
         
         with open(ply_file, 'rb') as f:
             # Check if it's PLY file
             first_line = f.readline().decode('ascii', errors='ignore').strip()
             if first_line != 'ply':
-                print(f"ERROR: Not a valid PLY file (should start with 'ply')")
+                log(f"ERROR: Not a valid PLY file (should start with 'ply')")
                 return False
             
             f.seek(0)  # Reset to beginning
@@ -159,10 +815,10 @@ def convert_ply_to_colmap(ply_file, output_file=None):
         properties = header_info['properties']
         data_start = header_info['data_start']
         
-        print(f"PLY Format: {format_type}")
-        print(f"Number of vertices: {vertex_count:,}")
-        print(f"Properties: {', '.join([p[1] for p in properties])}")
-        print()
+        log(f"PLY Format: {format_type}")
+        log(f"Number of vertices: {vertex_count:,}")
+        log(f"Properties: {', '.join([p[1] for p in properties])}")
+        log()
         
         # Find required properties (for ASCII format - we use indices)
         x_idx, _ = find_property_index(properties, 'x')
@@ -170,189 +826,210 @@ def convert_ply_to_colmap(ply_file, output_file=None):
         z_idx, _ = find_property_index(properties, 'z')
         
         # Look for color properties (can be red/green/blue or r/g/b)
-        r_idx, r_type = find_property_index(properties, 'red')
-        if r_idx is None:
-            r_idx, r_type = find_property_index(properties, 'r')
-        g_idx, g_type = find_property_index(properties, 'green')
-        if g_idx is None:
-            g_idx, g_type = find_property_index(properties, 'g')
-        b_idx, b_type = find_property_index(properties, 'blue')
-        if b_idx is None:
-            b_idx, b_type = find_property_index(properties, 'b')
+        r_idx, g_idx, b_idx = find_color_indices(properties)
         
         # Also store color property names for binary format
-        r_name = None
-        if r_idx is not None:
-            r_name = properties[r_idx][1]
-        g_name = None
-        if g_idx is not None:
-            g_name = properties[g_idx][1]
-        b_name = None
-        if b_idx is not None:
-            b_name = properties[b_idx][1]
+        r_name, g_name, b_name = (
+            properties[idx][1] if idx is not None else None for idx in (r_idx, g_idx, b_idx)
+        )
         
         if x_idx is None or y_idx is None or z_idx is None:
-            print("ERROR: PLY file must contain x, y, z coordinates")
+            log("ERROR: PLY file must contain x, y, z coordinates")
             return False
         
         has_colors = (r_idx is not None and g_idx is not None and b_idx is not None)
         if not has_colors:
-            print("WARNING: PLY file does not contain color information (red/green/blue)")
-            print("Points will be converted with default colors (128, 128, 128)")
+            log("WARNING: PLY file does not contain color information (red/green/blue)")
+            log("Points will be converted with default colors (128, 128, 128)")
         
         # Process vertices
-        print("Processing vertices and removing duplicates...")
-        print("Progress will be shown every 500,000 vertices")
-        print("-" * 40)
-        
-        unique_points = {}
-        processed = 0
+        if dedup:
+            log("Processing vertices and removing duplicates...")
+        else:
+            log("Processing vertices (duplicate removal disabled)...")
+        # The numpy paths process vertices in bulk and report progress per chunk or worker range
+        if np is None:
+            log("Progress will be shown every 500,000 vertices")
+        elif format_type != 'ascii' and chunk_size:
+            log(f"Progress will be shown every {chunk_size:,} vertices")
+        elif format_type != 'ascii' and workers and workers > 1:
+            log("Progress will be shown as each worker process finishes")
+        log("-" * 40)
         
+        vertices = None
+        unique = None
+        records = None
+        skipped = 0
         if format_type == 'ascii':
             # ASCII format processing
-            with open(ply_file, 'r', encoding='utf-8') as f:
-                # Skip header - read until end_header
-                for line in f:
-                    if line.strip() == 'end_header':
-                        break
-                
-                # Now read vertex data
-                for line in f:
-                    line = line.strip()
-                    if not line:
-                        continue
-                    
-                    parts = line.split()
-                    if len(parts) < max(x_idx, y_idx, z_idx) + 1:
-                        continue
-                    
-                    try:
-                        x, y, z = float(parts[x_idx]), float(parts[y_idx]), float(parts[z_idx])
-                        
-                        if r_idx is not None and g_idx is not None and b_idx is not None and len(parts) > max(r_idx, g_idx, b_idx):
-                            r, g, b = int(float(parts[r_idx])), int(float(parts[g_idx])), int(float(parts[b_idx]))
-                        else:
-                            r, g, b = 128, 128, 128  # Default gray
-                        
-                        # Create unique key from coordinates and colors
-                        key = f"{x:.6f}_{y:.6f}_{z:.6f}_{r}_{g}_{b}"
-                        if key not in unique_points:
-                            unique_points[key] = (x, y, z, r, g, b)
-                    except (ValueError, IndexError) as e:
-                        continue  # Skip invalid lines
-                    
-                    processed += 1
-                    if processed % 500000 == 0:
-                        progress = (processed / vertex_count) * 100 if vertex_count > 0 else 0
-                        print(f"Progress: {progress:.1f}% - Processed: {processed:,}, Unique: {len(unique_points):,}")
+            color_indices = (r_idx, g_idx, b_idx) if has_colors else (None, None, None)
+            if chunk_size or (workers and workers > 1):
+                log("NOTE: Chunked and parallel processing apply to binary PLY files only")
+            if np is not None:
+                vertices = load_ascii_vertices(ply_file, header_info, (x_idx, y_idx, z_idx), color_indices)
+            if vertices is None:
+                rows = read_ascii_vertices(ply_file, header_info, (x_idx, y_idx, z_idx), color_indices)
         
         else:
             # Binary format processing
             byte_order = '<' if format_type == 'binary_little_endian' else '>'
             
-            with open(ply_file, 'rb') as f:
-                f.seek(data_start)  # Skip to data section
-                
-                # Calculate vertex size
-                vertex_size = 0
-                for prop_type, prop_name in properties:
-                    if prop_type in ['float', 'float32', 'int', 'int32', 'uint', 'uint32']:
-                        vertex_size += 4
-                    elif prop_type in ['double', 'float64']:
-                        vertex_size += 8
-                    elif prop_type in ['uchar', 'uint8', 'char', 'int8']:
-                        vertex_size += 1
-                    elif prop_type in ['ushort', 'uint16', 'short', 'int16']:
-                        vertex_size += 2
-                    else:
-                        vertex_size += 4  # Default to 4 bytes
+            if np is not None:
+                coord_names = (properties[x_idx][1], properties[y_idx][1], properties[z_idx][1])
+                if chunk_size:
+                    work_dir = tempfile.mkdtemp(prefix="ply_chunks_", dir=Path(output_file).parent)
+                    records, skipped = dedup_binary_chunked(ply_file, header_info, byte_order, coord_names,
+                                                            (r_name, g_name, b_name), chunk_size, work_dir,
+                                                            progress_callback, log)
+                elif workers and workers > 1:
+                    unique, processed, skipped = dedup_binary_parallel(ply_file, header_info, byte_order,
+                                                                       coord_names, (r_name, g_name, b_name),
+                                                                       workers, progress_callback, log)
+                else:
+                    if pyminiply is not None:
+                        vertices = load_native_vertices(ply_file, header_info, coord_names, (r_name, g_name, b_name))
+                    if vertices is None:
+                        vertices = load_binary_vertices(ply_file, header_info, byte_order, coord_names,
+                                                        (r_name, g_name, b_name))
+            else:
+                rows = read_binary_vertices(ply_file, header_info, byte_order, (x_idx, y_idx, z_idx), (r_idx, g_idx, b_idx))
+        
+        if records is not None:
+            unique_count = len(records)
+        elif unique is not None:
+            qxyz, rgb = unique
+            unique_count = len(qxyz)
+        elif vertices is not None:
+            xyz, rgb = vertices
+            processed = len(xyz)
+            xyz, rgb, skipped = finite_vertices(xyz, rgb)
+            qxyz = quantize_coordinates(xyz)
+            if gpu:
+                qxyz, rgb = unique_vertices_gpu(qxyz, rgb)
+            elif dedup:
+                qxyz, rgb = unique_vertices(qxyz, rgb)
+            unique_count = len(qxyz)
+            report_progress(processed, processed, unique_count, progress_callback, log)
+        else:
+            # Unique points are kept as typed columns rather than one tuple
+            # of Python objects per point; the set only holds the keys
+            seen = set()
+            xs, ys, zs = array('d'), array('d'), array('d')
+            rs, gs, bs = array('q'), array('q'), array('q')
+            processed = 0
+            for x, y, z, r, g, b in rows:
+                is_new = True
+                if not (abs(x) < MAX_COORDINATE and abs(y) < MAX_COORDINATE and abs(z) < MAX_COORDINATE):
+                    # NaN, infinite or out of range, see finite_vertices
+                    skipped += 1
+                    is_new = False
+                elif dedup:
+                    sx, sy, sz = x * 1e6, y * 1e6, z * 1e6
+                    qx, qy, qz = round(sx), round(sy), round(sz)
+                    if not (qx and qy and qz
+                            and abs(sx - qx) < ROUNDING_MARGIN and abs(sy - qy) < ROUNDING_MARGIN
+                            and abs(sz - qz) < ROUNDING_MARGIN
+                            and abs(sx) + abs(sy) + abs(sz) < FAST_ROUNDING_LIMIT):
+                        # Near a tie, very large or zero (maybe -0.000000): quantize exactly
+                        qx, qy, qz = quantize_value(x), quantize_value(y), quantize_value(z)
+                    # Pack coordinates (in 1e-6 units) and colors into one integer key,
+                    # one 64-bit lane each like the int64 fields of POINT_RECORD_FIELDS
+                    key = (((((qx + KEY_LANE_OFFSET) << 64
+                              | (qy + KEY_LANE_OFFSET)) << 64
+                             | (qz + KEY_LANE_OFFSET)) << 64
+                            | (r + KEY_LANE_OFFSET)) << 64
+                           | (g + KEY_LANE_OFFSET)) << 64 | (b + KEY_LANE_OFFSET)
+                    is_new = key not in seen
+                    seen.add(key)
+                if is_new:
+                    xs.append(x)
+                    ys.append(y)
+                    zs.append(z)
+                    rs.append(r)
+                    gs.append(g)
+                    bs.append(b)
                 
-                # Read vertices
-                for i in range(vertex_count):
-                    vertex_data = f.read(vertex_size)
-                    if len(vertex_data) < vertex_size:
-                        break
-                    
-                    parsed_data, _ = parse_binary_vertex(vertex_data, properties, byte_order)
-                    
-                    # Get coordinates
-                    x = parsed_data.get('x', 0.0)
-                    y = parsed_data.get('y', 0.0)
-                    z = parsed_data.get('z', 0.0)
-                    
-                    # Get colors
-                    if has_colors and r_name and g_name and b_name:
-                        r = int(parsed_data.get(r_name, 128))
-                        g = int(parsed_data.get(g_name, 128))
-                        b = int(parsed_data.get(b_name, 128))
-                    else:
-                        # Try common color names
-                        r = int(parsed_data.get('red', parsed_data.get('r', parsed_data.get('Red', parsed_data.get('R', 128)))))
-                        g = int(parsed_data.get('green', parsed_data.get('g', parsed_data.get('Green', parsed_data.get('G', 128)))))
-                        b = int(parsed_data.get('blue', parsed_data.get('b', parsed_data.get('Blue', parsed_data.get('B', 128)))))
-                    
-                    # Create unique key from coordinates and colors
-                    key = f"{x:.6f}_{y:.6f}_{z:.6f}_{r}_{g}_{b}"
-                    if key not in unique_points:
-                        unique_points[key] = (x, y, z, r, g, b)
-                    
-                    processed += 1
-                    if processed % 500000 == 0:
-                        progress = (processed / vertex_count) * 100 if vertex_count > 0 else 0
-                        print(f"Progress: {progress:.1f}% - Processed: {processed:,}, Unique: {len(unique_points):,}")
+                processed += 1
+                if processed % 500000 == 0:
+                    report_progress(processed, vertex_count, len(xs), progress_callback, log)
+            unique_count = len(xs)
         
-        print("-" * 40)
-        print(f"Processing completed!")
-        print(f"Total unique points found: {len(unique_points):,}")
+        log("-" * 40)
+        if skipped:
+            log(f"WARNING: Skipped {skipped:,} vertices with NaN, infinite or out of range coordinates")
+        log(f"Processing completed!")
+        log(f"Total unique points found: {unique_count:,}")
         
         # Calculate compression ratio
         if vertex_count > 0:
-            compression_ratio = ((vertex_count - len(unique_points)) / vertex_count) * 100
-            print(f"Duplicates removed: {compression_ratio:.1f}%")
+            compression_ratio = ((vertex_count - unique_count) / vertex_count) * 100
+            log(f"Duplicates removed: {compression_ratio:.1f}%")
         
         # Write COLMAP format
-        print(f"\nWriting COLMAP format to: {output_file}")
-        with open(output_file, 'w', encoding='utf-8') as f:
+        log(f"\nWriting COLMAP format to: {output_file}")
+        # The output is plain ASCII, so it is written as bytes through a large buffer
+        with open(output_file, 'wb', buffering=OUTPUT_BUFFER_SIZE) as f:
             # Write COLMAP header
-            f.write("# 3D point list with one line of data per point:\n")
-            f.write("#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n")
-            f.write(f"# Number of points: {len(unique_points)}, mean track length: 0.0\n")
+            f.write(b"# 3D point list with one line of data per point:\n")
+            f.write(b"#   POINT3D_ID, X, Y, Z, R, G, B, ERROR, TRACK[] as (IMAGE_ID, POINT2D_IDX)\n")
+            f.write(f"# Number of points: {unique_count}, mean track length: 0.0\n".encode('ascii'))
             
             # Write points in COLMAP format
-            point_id = 1
-            for x, y, z, r, g, b in unique_points.values():
-                # COLMAP format: POINT3D_ID X Y Z R G B ERROR TRACK[]
-                # For dense cloud: ERROR = 0, TRACK[] is empty
-                f.write(f"{point_id} {x:.6f} {y:.6f} {z:.6f} {r} {g} {b} 0\n")
-                point_id += 1
+            if records is not None:
+                for start in range(0, unique_count, chunk_size):
+                    qxyz, rgb = unpack_point_records(records[start:start + chunk_size])
+                    write_colmap_points(f, qxyz, rgb, first_id=start + 1)
+            elif unique is not None or vertices is not None:
+                write_colmap_points(f, qxyz, rgb)
+            else:
+                for point_id, (x, y, z, r, g, b) in enumerate(zip(xs, ys, zs, rs, gs, bs), 1):
+                    # COLMAP format: POINT3D_ID X Y Z R G B ERROR TRACK[]
+                    # For dense cloud: ERROR = 0, TRACK[] is empty
+                    f.write(f"{point_id} {x:.6f} {y:.6f} {z:.6f} {r} {g} {b} 0\n".encode('ascii'))
         
         # Get file sizes
-        input_size = os.path.getsize(ply_file) / (1024 * 1024)  # MB
-        output_size = os.path.getsize(output_file) / (1024 * 1024)  # MB
+        output_bytes = os.path.getsize(output_file)
+        input_size = input_stat.st_size / (1024 * 1024)  # MB
+        output_size = output_bytes / (1024 * 1024)  # MB
         
-        print("=" * 60)
-        print("CONVERSION COMPLETED SUCCESSFULLY!")
-        print("=" * 60)
-        print(f"Input file size:  {input_size:.1f} MB")
-        print(f"Output file size: {output_size:.1f} MB")
-        print(f"Points created:   {point_id-1:,}")
-        print(f"Output file:      {output_file}")
-        print()
-        print("The file is now ready for use in Postshot!")
-        print("Place it in your COLMAP sparse/0/ folder and import in Postshot.")
-        print()
-        print("💡 Need help? Consult AI assistants (ChatGPT, Claude, etc.)")
-        print("   They can help troubleshoot any setup issues!")
-        print("   This tool works perfectly on my system.")
+        log("=" * 60)
+        log("CONVERSION COMPLETED SUCCESSFULLY!")
+        log("=" * 60)
+        log(f"Input file size:  {input_size:.1f} MB")
+        log(f"Output file size: {output_size:.1f} MB")
+        log(f"Points created:   {unique_count:,}")
+        log(f"Output file:      {output_file}")
+        log()
+        log("The file is now ready for use in Postshot!")
+        log("Place it in your COLMAP sparse/0/ folder and import in Postshot.")
+        log()
+        log("💡 Need help? Consult AI assistants (ChatGPT, Claude, etc.)")
+        log("   They can help troubleshoot any setup issues!")
+        log("   This tool works perfectly on my system.")
         
+        if stats is not None:
+            stats["points_count"] = unique_count
+            stats["output_size"] = output_bytes
         return True
         
     except Exception as e:
         import traceback
-        print(f"ERROR during conversion: {str(e)}")
-        print("\nDetailed error:")
+        log(f"ERROR during conversion: {str(e)}")
+        log("\nDetailed error:")
         traceback.print_exc()
         return False
+    
+    finally:
+        if work_dir is not None:
+            records = None  # Release the memory map before deleting its file
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+def positive_int(value):
+    """argparse type for options that take a count greater than zero"""
+    number = int(value)
+    if number <= 0:
+        raise argparse.ArgumentTypeError(f"must be a positive integer, got {value}")
+    return number
 
 def main():
     """Main function with command line interface"""
@@ -382,10 +1059,43 @@ Examples:
         help='Output COLMAP file path (default: same directory as input)'
     )
     
+    parser.add_argument(
+        '--chunk-size',
+        type=positive_int,
+        default=None,
+        metavar='N',
+        help='Process binary PLY files N vertices at a time to bound memory use '
+             '(for clouds larger than RAM, requires numpy; points are written sorted by position)'
+    )
+    
+    parser.add_argument(
+        '--workers',
+        type=positive_int,
+        default=None,
+        metavar='N',
+        help='Remove duplicates from binary PLY files in N processes (requires numpy; '
+             'default: single process)'
+    )
+    
+    parser.add_argument(
+        '--gpu',
+        action='store_true',
+        help='Remove duplicates on a CUDA GPU (requires numpy and cupy)'
+    )
+    
+    parser.add_argument(
+        '--no-dedup',
+        action='store_false',
+        dest='dedup',
+        help='Do not remove duplicate points (faster for clouds that are already unique)'
+    )
+    
     args = parser.parse_args()
     
     # Convert file
-    success = convert_ply_to_colmap(args.input_file, args.output_file)
+    success = convert_ply_to_colmap(args.input_file, args.output_file,
+                                    chunk_size=args.chunk_size, workers=args.workers, gpu=args.gpu,
+                                    dedup=args.dedup)
     
     if success:
         sys.exit(0)
@@ -393,4 +1103,5 @@ Examples:
         sys.exit(1)
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()  # Spawned workers in a frozen executable
     main()
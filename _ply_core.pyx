@@ -0,0 +1,147 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+Optional compiled kernels for Shramko_Andrii_ply_to_colmap_converter
+Used when numba is not installed; the converter falls back to pure
+numpy/Python code if this extension is not built.
+
+Build: pip install cython && python setup.py build_ext --inplace
+"""
+
+from libc.stdint cimport int64_t, uint64_t, INT64_MIN
+from libc.stdio cimport snprintf
+from libc.stdlib cimport malloc, realloc, free
+from libc.string cimport memcpy
+from cpython.bytes cimport PyBytes_FromStringAndSize
+
+cdef enum:
+    # Longest possible line: 20-digit id, three signed fixed-point
+    # coordinates (up to 28 characters each), three 20-digit colors
+    MAX_LINE = 256
+
+
+def first_occurrence_mask(const int64_t[:, ::1] qxyz, const int64_t[:, ::1] rgb):
+    """
+    Marks the first occurrence of every point (quantized coordinates + colors)
+
+    Returns:
+        bytearray: 1 for points to keep, 0 for duplicates
+    """
+    cdef Py_ssize_t n = qxyz.shape[0]
+    cdef Py_ssize_t size = 1
+    while size < 2 * n:
+        size <<= 1
+
+    keep = bytearray(n)
+    cdef unsigned char[::1] keep_view = keep
+    cdef int64_t *table = <int64_t *> malloc(size * sizeof(int64_t))
+    cdef uint64_t *hashes = <uint64_t *> malloc(max(n, 1) * sizeof(uint64_t))
+    if table == NULL or hashes == NULL:
+        free(table)
+        free(hashes)
+        raise MemoryError()
+
+    cdef Py_ssize_t i, j, slot
+    cdef int64_t k
+    cdef uint64_t h
+    cdef uint64_t slot_mask = <uint64_t> (size - 1)
+
+    with nogil:
+        for i in range(size):
+            table[i] = -1
+
+        for i in range(n):
+            # 64-bit FNV-1a over the six values
+            h = 14695981039346656037ULL
+            for j in range(3):
+                h = (h ^ <uint64_t> qxyz[i, j]) * 1099511628211ULL
+            for j in range(3):
+                h = (h ^ <uint64_t> rgb[i, j]) * 1099511628211ULL
+            hashes[i] = h
+
+            # Linear probing; sequential insertion keeps the earliest index
+            slot = <Py_ssize_t> (h & slot_mask)
+            while True:
+                k = table[slot]
+                if k == -1:
+                    table[slot] = i
+                    keep_view[i] = 1
+                    break
+                if (hashes[k] == h
+                        and qxyz[k, 0] == qxyz[i, 0] and qxyz[k, 1] == qxyz[i, 1] and qxyz[k, 2] == qxyz[i, 2]
+                        and rgb[k, 0] == rgb[i, 0] and rgb[k, 1] == rgb[i, 1] and rgb[k, 2] == rgb[i, 2]):
+                    break
+                slot = (slot + 1) & (size - 1)
+
+    free(table)
+    free(hashes)
+    return keep
+
+
+cdef inline uint64_t magnitude(int64_t q, const char **sign) noexcept nogil:
+    if q == INT64_MIN:
+        # NEGATIVE_ZERO in the converter: printed as -0.000000
+        sign[0] = b"-"
+        return 0
+    if q < 0:
+        sign[0] = b"-"
+        return <uint64_t> (-q)
+    sign[0] = b""
+    return <uint64_t> q
+
+
+def format_points(const int64_t[:, ::1] qxyz, const int64_t[:, ::1] rgb, long long first_id):
+    """
+    Formats points as COLMAP points3D.txt lines
+
+    Coordinates are given in integer 1e-6 units and printed as fixed-point
+    decimals with 6 digits, without going through floating point.
+
+    Returns:
+        bytes: "POINT3D_ID X Y Z R G B 0" lines, ids starting at first_id
+    """
+    cdef Py_ssize_t n = qxyz.shape[0]
+    cdef Py_ssize_t capacity = max(n, 1) * 64
+    cdef Py_ssize_t length = 0
+    cdef Py_ssize_t i
+    cdef int written
+    cdef bint failed = False
+    cdef char line[MAX_LINE]
+    cdef const char *sx
+    cdef const char *sy
+    cdef const char *sz
+    cdef uint64_t ax, ay, az
+    cdef char *grown
+    cdef char *buffer = <char *> malloc(capacity)
+    if buffer == NULL:
+        raise MemoryError()
+
+    with nogil:
+        for i in range(n):
+            ax = magnitude(qxyz[i, 0], &sx)
+            ay = magnitude(qxyz[i, 1], &sy)
+            az = magnitude(qxyz[i, 2], &sz)
+            written = snprintf(line, MAX_LINE,
+                               b"%lld %s%llu.%06llu %s%llu.%06llu %s%llu.%06llu %lld %lld %lld 0\n",
+                               first_id + i,
+                               sx, <unsigned long long> (ax // 1000000), <unsigned long long> (ax % 1000000),
+                               sy, <unsigned long long> (ay // 1000000), <unsigned long long> (ay % 1000000),
+                               sz, <unsigned long long> (az // 1000000), <unsigned long long> (az % 1000000),
+                               <long long> rgb[i, 0], <long long> rgb[i, 1], <long long> rgb[i, 2])
+            if length + written > capacity:
+                capacity = 2 * capacity + written
+                grown = <char *> realloc(buffer, capacity)
+                if grown == NULL:
+                    failed = True
+                    break
+                buffer = grown
+            memcpy(buffer + length, line, written)
+            length += written
+
+    if failed:
+        free(buffer)
+        raise MemoryError()
+
+    try:
+        return PyBytes_FromStringAndSize(buffer, length)
+    finally:
+        free(buffer)
@@ -0,0 +1,3 @@
+"""Generated by tools/freeze_requirements.py from requirements.txt - do not edit"""
+
+REQUIREMENTS = ()
@@ -52,11 +52,8 @@ if not exist "Shramko_Andrii_ply_to_colmap_converter.py" (
 echo All required files found
 
 echo.
-echo [3/5] Cleaning previous builds...
-if exist "build" rmdir /s /q "build"
-if exist "dist" rmdir /s /q "dist"
-if exist "__pycache__" rmdir /s /q "__pycache__"
-echo Cleaned
+echo [3/5] Keeping previous builds...
+echo build\ is reused by PyInstaller, pass --clean to start from scratch
 
 echo.
 echo [4/5] Building executable...
@@ -64,7 +61,7 @@ echo This may take a few minutes...
 echo.
 
 REM Use Python script for better control
-python build_portable.py
+python build_portable.py %*
 
 if errorlevel 1 (
     echo.
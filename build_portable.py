@@ -9,7 +9,71 @@ import subprocess
 import sys
 import os
 import shutil
+import argparse
+import hashlib
+import importlib
+import json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from fs_util import cached_stat, invalidate
+
+# Files the executable is built from; a change in any of them invalidates the build cache
+REQUIRED_FILES = [
+    'gui_converter.py',
+    'Shramko_Andrii_ply_to_colmap_converter.py',
+    'fs_util.py',
+    'PLY_Converter.spec'
+]
+
+EXE_NAME = 'PLY_to_COLMAP_Converter.exe'
+
+# PyInstaller output and working directories. WORK_DIR keeps the results of
+# every build stage (Analysis, PYZ, PKG, EXE), each of which PyInstaller
+# only redoes when its own inputs changed
+DIST_DIR = Path('dist')
+WORK_DIR = Path('build')
+
+# Previously built executables, stored by build key (see compute_build_key)
+CACHE_DIR = Path('.build_cache')
+MAX_CACHED_BUILDS = 5
+
+# Pinned build tools, installed into BUILD_ENV_DIR with --build-env
+BUILD_REQUIREMENTS = 'build-requirements.txt'
+BUILD_ENV_DIR = Path('build_env')
+PIP_CACHE_DIR = Path('.pip-cache')
+
+# Optional local wheels (PyInstaller and its dependencies); when present,
+# build tools are installed from here without network access
+WHEELS_DIR = Path('vendor') / 'wheels'
+
+# Modules left out of --slim builds: large packages that may be installed in
+# the build environment (including the converter's optional accelerators)
+# and stdlib parts the GUI never uses
+SLIM_EXCLUDES = [
+    'numpy', 'numba', 'cupy', 'scipy', 'matplotlib', 'PIL', 'pandas',
+    'PyQt5', 'PyQt6', 'PySide2', 'PySide6', 'cryptography', 'setuptools', 'pip',
+    'pydoc_data', 'tkinter.test', 'test', 'unittest', 'distutils', 'lib2to3',
+    'xmlrpc', 'http.server', 'email.test',
+]
+
+# Installed distributions PyInstaller may bundle (the converter's optional
+# accelerators and their dependencies); their versions are part of the build key
+BUNDLED_DISTRIBUTIONS = [
+    'numpy', 'numba', 'llvmlite', 'cupy', 'cupy-cuda11x', 'cupy-cuda12x',
+    'pyinstaller-hooks-contrib',
+]
+
+# Compiled _ply_core extension (see setup.py), bundled when it is built in place
+EXTENSION_PATTERNS = ['_ply_core*.so', '_ply_core*.pyd']
+
+# DLLs that must not be UPX-compressed (breaks them or trips antivirus software)
+UPX_EXCLUDE = [
+    'vcruntime140.dll',
+    'python3.dll',
+    f'python{sys.version_info.major}{sys.version_info.minor}.dll',
+]
 
 def print_header(text):
     """Print formatted header"""
@@ -17,55 +81,142 @@ def print_header(text):
     print(f"  {text}")
     print("=" * 70 + "\n")
 
-def check_pyinstaller():
-    """Check if PyInstaller is installed"""
+def pip_source_args():
+    """Returns pip options to install from WHEELS_DIR when it contains wheels"""
+    if WHEELS_DIR.is_dir() and any(WHEELS_DIR.glob('*.whl')):
+        return ['--no-index', '--find-links', str(WHEELS_DIR)]
+    return []
+
+def venv_python(env_dir):
+    """Returns the path of the Python interpreter in a virtual environment"""
+    if os.name == 'nt':
+        return str(env_dir / 'Scripts' / 'python.exe')
+    return str(env_dir / 'bin' / 'python')
+
+def setup_build_env():
+    """
+    Creates the build virtual environment with the pinned build requirements
+    
+    The requirements are only installed when build-requirements.txt changed
+    since the last run; downloaded wheels are kept in .pip-cache/.
+    
+    Returns:
+        str: Python interpreter of the build environment, or None on failure
+    """
+    python = venv_python(BUILD_ENV_DIR)
+    stamp = BUILD_ENV_DIR / 'build-requirements.sha256'
+    
+    try:
+        if not os.path.exists(python):
+            print(f"🐍 Creating build environment in {BUILD_ENV_DIR}/...")
+            subprocess.check_call([sys.executable, '-m', 'venv', str(BUILD_ENV_DIR)])
+        
+        requirements_hash = hash_file(BUILD_REQUIREMENTS)
+        if not stamp.exists() or stamp.read_text() != requirements_hash:
+            print(f"📦 Installing {BUILD_REQUIREMENTS}...")
+            env = dict(os.environ, PIP_CACHE_DIR=str(PIP_CACHE_DIR.absolute()))
+            subprocess.check_call([python, '-m', 'pip', 'install', *pip_source_args(),
+                                   '-r', BUILD_REQUIREMENTS], env=env)
+            stamp.write_text(requirements_hash)
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"❌ Could not set up build environment: {e}")
+        return None
+    
+    print(f"✅ Build environment ready: {BUILD_ENV_DIR}/")
+    return python
+
+def check_pyinstaller(python=None):
+    """
+    Check if PyInstaller is installed
+    
+    Args:
+        python (str): Interpreter to check (a build environment), None for
+            the one running this script
+    
+    Returns:
+        str: PyInstaller version, or None if it is not available
+    """
+    if python is not None:
+        try:
+            version = subprocess.check_output(
+                [python, '-c', 'import PyInstaller; print(PyInstaller.__version__)'], text=True
+            ).strip()
+        except (OSError, subprocess.CalledProcessError):
+            print(f"❌ PyInstaller is not installed in {python}")
+            return None
+        print(f"✅ PyInstaller {version} is installed")
+        return version
+    
     try:
         import PyInstaller
         version = PyInstaller.__version__
         print(f"✅ PyInstaller {version} is installed")
-        return True
+        return version
     except ImportError:
         print("❌ PyInstaller is not installed")
-        response = input("Install PyInstaller? (y/n): ")
+        # Without a terminal (CI) there is nobody to ask, so install right away
+        response = input("Install PyInstaller? (y/n): ") if sys.stdin.isatty() else 'y'
         if response.lower() == 'y':
             print("Installing PyInstaller...")
             try:
-                subprocess.check_call([sys.executable, "-m", "pip", "install", "pyinstaller"], 
+                subprocess.check_call([sys.executable, "-m", "pip", "install", *pip_source_args(), "pyinstaller"],
                                     stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
                 print("✅ PyInstaller installed successfully")
-                return True
-            except subprocess.CalledProcessError:
+                # The import system caches directory listings; without this the
+                # package installed above may not be found in this process
+                importlib.invalidate_caches()
+                import PyInstaller
+                return PyInstaller.__version__
+            except (subprocess.CalledProcessError, ImportError):
                 print("❌ Failed to install PyInstaller")
-                return False
+                return None
         else:
             print("❌ PyInstaller is required for building")
-            return False
+            return None
+
+def hash_file(path):
+    """Returns the SHA-256 digest of a file"""
+    return hashlib.sha256(Path(path).read_bytes()).hexdigest()
+
+def find_upx():
+    """Finds the UPX executable packer, returns its directory or None"""
+    upx_path = shutil.which('upx')
+    if upx_path is None:
+        print("ℹ️  UPX not found in PATH, the executable will not be compressed")
+        return None
+    
+    print(f"✅ UPX found: {upx_path}")
+    return os.path.dirname(upx_path)
 
 def check_required_files():
-    """Check if all required files exist"""
-    required_files = [
-        'gui_converter.py',
-        'Shramko_Andrii_ply_to_colmap_converter.py',
-        'PLY_Converter.spec'
-    ]
-    
-    missing = []
-    for file in required_files:
-        if not os.path.exists(file):
-            missing.append(file)
+    """
+    Check if all required files exist
+    
+    Returns:
+        dict: SHA-256 digest of every required file (used for the build key),
+        or None if any of them is missing
+    """
+    missing = [file for file in REQUIRED_FILES if cached_stat(file) is None]
     
     if missing:
         print(f"❌ Missing required files: {', '.join(missing)}")
-        return False
+        return None
+    
+    # Files are hashed in parallel (hashlib releases the GIL for large inputs)
+    with ThreadPoolExecutor(max_workers=len(REQUIRED_FILES)) as executor:
+        digests = dict(zip(REQUIRED_FILES, executor.map(hash_file, REQUIRED_FILES)))
     
     print("✅ All required files found")
-    return True
+    return digests
 
 def clean_build_dirs():
-    """Clean previous build directories"""
-    dirs_to_clean = ['build', 'dist', '__pycache__']
+    """
+    Clean previous build directories
     
-    for dir_name in dirs_to_clean:
+    Only done on request: PyInstaller reuses its analysis results in build/
+    when the sources it depends on are unchanged.
+    """
+    for dir_name in [str(WORK_DIR), str(DIST_DIR), '__pycache__']:
         if os.path.exists(dir_name):
             try:
                 shutil.rmtree(dir_name)
@@ -73,10 +224,133 @@ def clean_build_dirs():
             except Exception as e:
                 print(f"⚠️  Could not clean {dir_name}/: {e}")
 
-def build_executable():
-    """Build the executable using PyInstaller"""
+def distribution_versions():
+    """Returns the installed version of each BUNDLED_DISTRIBUTIONS package (None if not installed)"""
+    import importlib.metadata
+    versions = {}
+    for name in BUNDLED_DISTRIBUTIONS:
+        try:
+            versions[name] = importlib.metadata.version(name)
+        except importlib.metadata.PackageNotFoundError:
+            versions[name] = None
+    return versions
+
+def bundled_versions(python=None):
+    """
+    Returns distribution_versions() of the interpreter PyInstaller runs with
+    
+    Args:
+        python (str): Interpreter of a build environment, None for the one
+            running this script
+    """
+    if python is None:
+        return distribution_versions()
+    try:
+        output = subprocess.check_output(
+            [python, '-c', 'import json, build_portable; print(json.dumps(build_portable.distribution_versions()))'],
+            text=True
+        )
+        return json.loads(output)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return {}
+
+def compute_build_key(digests, pyinstaller_version, options=(), python=None):
+    """
+    Computes a hash of everything the executable depends on: the file
+    digests, build options, the versions of bundled distributions and the
+    built _ply_core extension
+    """
+    key = hashlib.sha256()
+    key.update(sys.version.encode())
+    key.update(pyinstaller_version.encode())
+    for option in options:
+        key.update(f"option:{option}".encode())
+    for file in sorted(digests):
+        key.update(f"{file}:{digests[file]}".encode())
+    for name, version in sorted(bundled_versions(python).items()):
+        key.update(f"dist:{name}=={version}".encode())
+    for pattern in EXTENSION_PATTERNS:
+        for path in sorted(Path('.').glob(pattern)):
+            key.update(f"ext:{path.name}:{hash_file(path)}".encode())
+    return key.hexdigest()
+
+def load_cache_index():
+    """Loads the build cache index (build key -> last use time)"""
+    try:
+        with open(CACHE_DIR / 'index.json', 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def save_cache_index(index):
+    """Saves the build cache index, removing the least recently used builds"""
+    for key in sorted(index, key=index.get)[:-MAX_CACHED_BUILDS]:
+        shutil.rmtree(CACHE_DIR / key, ignore_errors=True)
+        del index[key]
+    
+    try:
+        with open(CACHE_DIR / 'index.json', 'w', encoding='utf-8') as f:
+            json.dump(index, f, indent=2)
+    except OSError as e:
+        print(f"⚠️  Could not update build cache index: {e}")
+
+def restore_cached_build(key):
+    """Copies a cached executable for this build key to dist/, returns True on a cache hit"""
+    cached_exe = CACHE_DIR / key / EXE_NAME
+    if not cached_exe.exists():
+        return False
+    
+    try:
+        DIST_DIR.mkdir(exist_ok=True)
+        shutil.copy2(cached_exe, DIST_DIR / EXE_NAME)
+        invalidate(DIST_DIR / EXE_NAME)
+    except OSError as e:
+        print(f"⚠️  Could not use cached build: {e}")
+        return False
+    
+    index = load_cache_index()
+    index[key] = time.time()
+    save_cache_index(index)
+    print(f"♻️  Sources unchanged, using cached build {key[:12]}")
+    return True
+
+def store_cached_build(key):
+    """Stores the executable from dist/ in the build cache"""
+    try:
+        (CACHE_DIR / key).mkdir(parents=True, exist_ok=True)
+        shutil.copy2(DIST_DIR / EXE_NAME, CACHE_DIR / key / EXE_NAME)
+    except OSError as e:
+        print(f"⚠️  Could not cache build: {e}")
+        return
+    
+    index = load_cache_index()
+    index[key] = time.time()
+    save_cache_index(index)
+
+def pump_output(stream):
+    """Echoes a subprocess output stream line by line until it is closed"""
+    for line in stream:
+        print(line, end='', flush=True)
+    stream.close()
+
+def build_executable(excludes=(), upx_dir=None, while_building=None, python=None):
+    """
+    Build the executable using PyInstaller
+    
+    Args:
+        excludes (list): Modules to leave out of the executable
+        upx_dir (str): Directory of the UPX packer used to compress the
+            executable, None to build it uncompressed
+        while_building (callable): Work done while PyInstaller is running
+        python (str): Interpreter to run PyInstaller with (a build
+            environment), None for the pyinstaller command in PATH
+    """
     print_header("Building Portable Executable")
     
+    # PLY_Converter.spec reads the excluded modules and UPX setting from the environment
+    env = dict(os.environ, PLY_CONVERTER_EXCLUDES=','.join(excludes),
+               PLY_CONVERTER_UPX='1' if upx_dir else '0')
+    
     # Check if spec file exists
     if not os.path.exists('PLY_Converter.spec'):
         print("❌ PLY_Converter.spec file not found!")
@@ -94,45 +368,73 @@ def build_executable():
             '--hidden-import', 'tkinter.scrolledtext',
             '--hidden-import', 'tkinter.ttk',
             '--hidden-import', 'Shramko_Andrii_ply_to_colmap_converter',
-            '--clean',
-            'gui_converter.py'
+            '--optimize', '2',  # Bytecode as with python -OO (PyInstaller 6.0+)
+            '--noconfirm',
         ]
+        for module in excludes:
+            cmd += ['--exclude-module', module]
+        if upx_dir:
+            for dll in UPX_EXCLUDE:
+                cmd += ['--upx-exclude', dll]
+        else:
+            cmd.append('--noupx')
+        cmd.append('gui_converter.py')
     else:
         print("📋 Using PLY_Converter.spec file")
         cmd = [
             'pyinstaller',
-            '--clean',
+            '--noconfirm',
             'PLY_Converter.spec'
         ]
     
+    # Accepted with a spec file as well
+    cmd[1:1] = ['--distpath', str(DIST_DIR), '--workpath', str(WORK_DIR)]
+    if upx_dir:
+        cmd[1:1] = ['--upx-dir', upx_dir]
+    if python is not None:
+        cmd[0:1] = [python, '-m', 'PyInstaller']
+    
     print("🔨 Running PyInstaller...")
     print(f"   Command: {' '.join(cmd)}\n")
     
     try:
-        # Run PyInstaller
-        result = subprocess.run(
+        # Run PyInstaller; its output is echoed by a background thread so
+        # this one is free for other work in the meantime
+        process = subprocess.Popen(
             cmd,
-            check=True,
-            capture_output=False,
-            text=True
+            env=env,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.STDOUT,
+            bufsize=1,
+            text=True,
+            errors='replace'
         )
-        
-        return True
-        
-    except subprocess.CalledProcessError as e:
-        print(f"\n❌ Build failed with error code {e.returncode}")
-        return False
     except FileNotFoundError:
         print("\n❌ PyInstaller not found in PATH")
         print("   Make sure PyInstaller is installed and accessible")
         return False
+    
+    pump = threading.Thread(target=pump_output, args=(process.stdout,), daemon=True)
+    pump.start()
+    try:
+        if while_building is not None:
+            while_building()
+    finally:
+        returncode = process.wait()
+        pump.join()
+    
+    if returncode != 0:
+        print(f"\n❌ Build failed with error code {returncode}")
+        return False
+    return True
 
 def verify_build():
     """Verify that the executable was created"""
-    exe_path = Path('dist') / 'PLY_to_COLMAP_Converter.exe'
+    exe_path = DIST_DIR / EXE_NAME
     
-    if exe_path.exists():
-        size_mb = exe_path.stat().st_size / (1024 * 1024)
+    st = cached_stat(exe_path)
+    if st is not None:
+        size_mb = st.st_size / (1024 * 1024)
         print(f"✅ Executable created successfully!")
         print(f"   Location: {exe_path.absolute()}")
         print(f"   Size: {size_mb:.1f} MB")
@@ -174,8 +476,9 @@ Created by: Andrii Shramko
 License: MIT - Free for community use
 """
     
-    readme_path = Path('dist') / 'README.txt'
+    readme_path = DIST_DIR / 'README.txt'
     try:
+        readme_path.parent.mkdir(exist_ok=True)
         with open(readme_path, 'w', encoding='utf-8') as f:
             f.write(readme_content)
         print(f"📄 Created README.txt in dist/")
@@ -184,40 +487,88 @@ License: MIT - Free for community use
 
 def main():
     """Main build function"""
+    parser = argparse.ArgumentParser(description="Build portable PLY to COLMAP Converter executable")
+    parser.add_argument(
+        '--force',
+        action='store_true',
+        help='Rebuild even if the sources are unchanged'
+    )
+    parser.add_argument(
+        '--clean',
+        action='store_true',
+        help='Remove build/, dist/ and __pycache__/ first (full PyInstaller rebuild)'
+    )
+    parser.add_argument(
+        '--slim',
+        action='store_true',
+        help='Leave optional packages and unused stdlib modules out of the executable (smaller exe)'
+    )
+    parser.add_argument(
+        '--no-upx',
+        action='store_true',
+        help='Do not compress the executable with UPX (e.g. to rule out antivirus false positives)'
+    )
+    parser.add_argument(
+        '--build-env',
+        action='store_true',
+        help=f'Build with the pinned {BUILD_REQUIREMENTS} in a reusable virtual environment ({BUILD_ENV_DIR}/)'
+    )
+    args = parser.parse_args()
+    
     print_header("PLY to COLMAP Converter - Portable Build")
     
     print("This script will create a standalone portable executable")
     print("that works on Windows 10/11 without any dependencies.\n")
     
     # Step 1: Check PyInstaller
-    if not check_pyinstaller():
+    python = None
+    if args.build_env:
+        python = setup_build_env()
+        if python is None:
+            return False
+    pyinstaller_version = check_pyinstaller(python)
+    if pyinstaller_version is None:
         return False
     
+    upx_dir = None if args.no_upx else find_upx()
+    
     # Step 2: Check required files
-    if not check_required_files():
+    digests = check_required_files()
+    if digests is None:
         return False
     
-    # Step 3: Clean previous builds
-    print("\n🧹 Cleaning previous build directories...")
-    clean_build_dirs()
+    # Step 3: Clean previous builds (only on request, build/ speeds up rebuilds)
+    excludes = SLIM_EXCLUDES if args.slim else []
+    options = (['slim'] if args.slim else []) + (['upx'] if upx_dir else [])
+    build_key = compute_build_key(digests, pyinstaller_version, options, python)
+    if args.clean:
+        print("\n🧹 Cleaning previous build directories...")
+        clean_build_dirs()
     
-    # Step 4: Build executable
-    if not build_executable():
-        return False
+    # Step 4: Build executable (README.txt is written while PyInstaller runs)
+    readme_created = False
+    if args.force or not restore_cached_build(build_key):
+        if not build_executable(excludes, upx_dir, while_building=create_readme, python=python):
+            return False
+        readme_created = True
+        invalidate()  # PyInstaller has written dist/
+        if cached_stat(DIST_DIR / EXE_NAME) is not None:
+            store_cached_build(build_key)
     
     # Step 5: Verify build
     print("\n🔍 Verifying build...")
     if not verify_build():
         return False
     
-    # Step 6: Create README
-    print("\n📝 Creating documentation...")
-    create_readme()
+    # Step 6: Create README (unless it was created during the build)
+    if not readme_created:
+        print("\n📝 Creating documentation...")
+        create_readme()
     
     # Success message
     print_header("Build Completed Successfully!")
     
-    exe_path = Path('dist') / 'PLY_to_COLMAP_Converter.exe'
+    exe_path = DIST_DIR / EXE_NAME
     print(f"✅ Portable executable created: {exe_path.absolute()}")
     print()
     print("📦 The executable is ready for distribution!")
@@ -4,11 +4,10 @@
 Конвертирует PLY файл в COLMAP формат с сохранением бэкапа исходного файла
 """
 
-import os
 import sys
-import shutil
+import time
 from pathlib import Path
-from datetime import datetime
+from fs_util import cached_stat, invalidate, copy_file_fast
 from Shramko_Andrii_ply_to_colmap_converter import convert_ply_to_colmap
 
 def create_backup(file_path):
@@ -21,17 +20,19 @@ def create_backup(file_path):
     Returns:
         str: Путь к бэкап файлу или None в случае ошибки
     """
-    if not os.path.exists(file_path):
+    st = cached_stat(file_path)
+    if st is None:
         print(f"⚠️  Файл {file_path} не существует, бэкап не требуется")
         return None
     
     file_path_obj = Path(file_path)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     backup_path = file_path_obj.parent / f"{file_path_obj.stem}_backup_{timestamp}{file_path_obj.suffix}"
     
     try:
-        shutil.copy2(file_path, backup_path)
-        file_size = os.path.getsize(file_path) / (1024 * 1024)  # MB
+        copy_file_fast(file_path, backup_path)
+        invalidate(backup_path)
+        file_size = st.st_size / (1024 * 1024)  # MB
         print(f"✅ Бэкап создан: {backup_path}")
         print(f"   Размер: {file_size:.1f} MB")
         return str(backup_path)
@@ -57,7 +58,7 @@ def convert_ply_file(ply_file_path, output_name="points3D.txt"):
     
     # Проверка существования файла
     ply_path = Path(ply_file_path)
-    if not ply_path.exists():
+    if cached_stat(ply_path) is None:
         print(f"❌ Ошибка: Файл '{ply_file_path}' не найден!")
         return False
     
@@ -68,7 +69,7 @@ def convert_ply_file(ply_file_path, output_name="points3D.txt"):
     print("📦 Создание бэкапа исходного файла...")
     backup_path = create_backup(ply_file_path)
     
-    if backup_path is None and os.path.exists(ply_file_path):
+    if backup_path is None and cached_stat(ply_file_path) is not None:
         response = input("Бэкап не создан. Продолжить? (y/n): ")
         if response.lower() != 'y':
             print("❌ Операция отменена пользователем")
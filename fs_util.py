@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+File system helpers shared by the converter and build scripts
+
+stat() results are cached per path, so checking that a file exists and
+then reporting its size costs a single system call. Anything that writes
+a path must call invalidate() for it afterwards.
+
+copy_file_fast() copies large files (backups of PLY files) with the
+fastest method the system offers.
+"""
+
+import os
+import sys
+import shutil
+
+_stat_cache = {}
+
+def cached_stat(path):
+    """
+    Returns os.stat() of a path, cached until invalidate() is called for it
+
+    Returns:
+        os.stat_result: File status, or None if the path does not exist
+    """
+    key = os.fspath(path)
+    try:
+        return _stat_cache[key]
+    except KeyError:
+        pass
+
+    try:
+        st = os.stat(key)
+    except (FileNotFoundError, NotADirectoryError):
+        st = None
+    _stat_cache[key] = st
+    return st
+
+def invalidate(path=None):
+    """Forgets the cached status of a path (of all paths if path is None)"""
+    if path is None:
+        _stat_cache.clear()
+    else:
+        _stat_cache.pop(os.fspath(path), None)
+
+# Buffer size for copying when no faster system method is available
+COPY_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Linux ioctl that creates a clone of a file (reflink)
+FICLONE = 0x40049409
+
+# CopyFileExW flag: unbuffered I/O, recommended for very large files
+COPY_FILE_NO_BUFFERING = 0x00001000
+
+def reflink_file(src, dst):
+    """
+    Tries to create a clone of a file (reflink): the copy shares the data
+    blocks of the source until one of them is modified (copy-on-write).
+    It is created instantly and takes no disk space.
+
+    Unlike a hard link, a clone is an independent file: changing the
+    source does not affect the backup.
+
+    Supported on Btrfs, XFS (Linux) and APFS (macOS)
+
+    Returns:
+        bool: True if the clone was created
+    """
+    if sys.platform == 'darwin':
+        import ctypes
+        libc = ctypes.CDLL(None, use_errno=True)
+        # clonefile copies the file metadata as well
+        return libc.clonefile(os.fsencode(src), os.fsencode(dst), 0) == 0
+
+    if sys.platform.startswith('linux'):
+        import fcntl
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+        except OSError:
+            return False  # File system does not support clones
+        shutil.copystat(src, dst)
+        return True
+
+    return False
+
+def copy_file_fast(src, dst):
+    """
+    Copies a file with its metadata (like shutil.copy2), using the fastest
+    method available on the system
+
+    Clone (reflink_file) if the file system supports it
+    Windows: CopyFileExW without buffering (on ReFS / Dev Drive in
+    Windows 11 it clones the blocks by itself)
+    Linux: os.copy_file_range (copying inside the kernel)
+    Otherwise: copying in 4 MB blocks
+    """
+    if reflink_file(src, dst):
+        return
+
+    if os.name == 'nt':
+        import ctypes
+        # CopyFileExW keeps attributes and modification time by itself
+        if ctypes.windll.kernel32.CopyFileExW(str(src), str(dst), None, None, None,
+                                              COPY_FILE_NO_BUFFERING):
+            return
+    elif hasattr(os, 'copy_file_range'):
+        try:
+            with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+                remaining = os.fstat(fsrc.fileno()).st_size
+                while remaining > 0:
+                    copied = os.copy_file_range(fsrc.fileno(), fdst.fileno(), remaining)
+                    if copied == 0:
+                        break
+                    remaining -= copied
+            shutil.copystat(src, dst)
+            return
+        except OSError:
+            pass  # Not supported by the file system - copy the usual way
+
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        shutil.copyfileobj(fsrc, fdst, length=COPY_BUFFER_SIZE)
+    shutil.copystat(src, dst)
@@ -8,8 +8,9 @@ With automatic backup and result display
 import os
 import sys
 import json
-import shutil
+import hashlib
 import threading
+import queue
 import io
 import contextlib
 import webbrowser
@@ -17,43 +18,97 @@ import time
 import tkinter as tk
 from tkinter import filedialog, messagebox, scrolledtext, ttk
 from pathlib import Path
-from datetime import datetime
-from Shramko_Andrii_ply_to_colmap_converter import convert_ply_to_colmap
+from fs_util import cached_stat, invalidate, copy_file_fast
 
 # Configuration file name
 CONFIG_FILE = "config.json"
 GITHUB_URL = "https://github.com/AndriiShramko/ply-to-colmap-converter"
 
+# Log messages and progress from the conversion thread are applied to the
+# window at most this often (ms) instead of once per message
+UI_POLL_INTERVAL = 33
+
+# The log window keeps only this many most recent lines
+MAX_LOG_LINES = 5000
+
+# Progress (in percent) the bar has to advance before the ETA is recalculated
+ETA_MIN_STEP = 0.5
+
+# Configuration changes are written to disk after this delay (ms), so that
+# several changes in a row result in a single write
+CONFIG_SAVE_DELAY = 500
+
+# Configuration as last loaded or saved, and a hash of its file contents
+_config_cache = None
+_config_hash = None
+
+def serialize_config(config):
+    """Returns configuration as config.json contents"""
+    return json.dumps(config, ensure_ascii=False, indent=2).encode('utf-8')
+
 def load_config():
-    """Loads configuration from file"""
+    """Loads configuration from file (read from disk only once)"""
+    global _config_cache, _config_hash
+    if _config_cache is not None:
+        return _config_cache
+    
+    config = {"last_path": ""}
     if os.path.exists(CONFIG_FILE):
         try:
             with open(CONFIG_FILE, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                config = json.load(f)
+            _config_hash = hashlib.blake2b(serialize_config(config)).digest()
         except Exception as e:
             print(f"Error loading configuration: {e}")
-    return {"last_path": ""}
+    _config_cache = config
+    return config
 
 def save_config(config):
-    """Saves configuration to file"""
+    """
+    Saves configuration to file
+    
+    Nothing is written if the contents did not change. The file is written
+    under a temporary name and then renamed, so it is never left half-written.
+    """
+    global _config_cache, _config_hash
+    _config_cache = config
     try:
-        with open(CONFIG_FILE, 'w', encoding='utf-8') as f:
-            json.dump(config, f, ensure_ascii=False, indent=2)
+        data = serialize_config(config)
+        digest = hashlib.blake2b(data).digest()
+        if digest == _config_hash:
+            return
+        
+        temp_file = CONFIG_FILE + ".tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(data)
+        os.replace(temp_file, CONFIG_FILE)
+        _config_hash = digest
     except Exception as e:
         print(f"Error saving configuration: {e}")
 
+def preload_converter():
+    """
+    Imports the converter module
+    
+    It is imported on first use rather than at startup (it pulls in numpy
+    when installed), so that the window shows up without waiting for it.
+    """
+    import Shramko_Andrii_ply_to_colmap_converter
+
 def create_backup(file_path):
     """Creates backup of file with timestamp"""
-    if not os.path.exists(file_path):
+    st = cached_stat(file_path)
+    if st is None:
         return None
     
     file_path_obj = Path(file_path)
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
     backup_path = file_path_obj.parent / f"{file_path_obj.stem}_backup_{timestamp}{file_path_obj.suffix}"
     
     try:
-        shutil.copy2(file_path, backup_path)
-        file_size = os.path.getsize(file_path) / (1024 * 1024)  # MB
+        copy_file_fast(file_path, backup_path)
+        invalidate(backup_path)
+        file_size = st.st_size / (1024 * 1024)  # MB
         return str(backup_path), file_size
     except Exception as e:
         raise Exception(f"Error creating backup: {e}")
@@ -87,9 +142,13 @@ def convert_ply_file_gui(ply_file_path, output_name="points3D.txt", log_callback
             log_callback("PLY to COLMAP Converter with Backup\n")
             log_callback("=" * 70 + "\n\n")
         
-        # Check if file exists
+        # Check if file exists; the file may have changed since an earlier
+        # conversion, so its status is read again here and then reused by
+        # create_backup
         ply_path = Path(ply_file_path)
-        if not ply_path.exists():
+        invalidate(ply_path)
+        st = cached_stat(ply_path)
+        if st is None:
             error_msg = f"❌ Error: File '{ply_file_path}' not found!"
             result["error"] = error_msg
             if log_callback:
@@ -100,14 +159,14 @@ def convert_ply_file_gui(ply_file_path, output_name="points3D.txt", log_callback
             if log_callback:
                 log_callback(f"⚠️  Warning: File does not have .ply extension\n")
         
-        result["file_size_input"] = os.path.getsize(ply_file_path) / (1024 * 1024)  # MB
+        result["file_size_input"] = st.st_size / (1024 * 1024)  # MB
         
         # Create backup
         if log_callback:
             log_callback("📦 Creating backup of source file...\n")
         
         try:
-            backup_path, backup_size = create_backup(ply_file_path)
+            backup_path, backup_size = create_backup(ply_path)
             result["backup_path"] = backup_path
             if log_callback:
                 log_callback(f"✅ Backup created: {backup_path}\n")
@@ -127,64 +186,24 @@ def convert_ply_file_gui(ply_file_path, output_name="points3D.txt", log_callback
         if log_callback:
             log_callback("🔄 Starting conversion...\n\n")
         
-        # Create wrapper that captures output and calls progress_callback in real-time
-        class ProgressWriter:
-            def __init__(self, log_callback, progress_callback):
-                self.log_callback = log_callback
-                self.progress_callback = progress_callback
-                self.buffer = ""
-            
-            def write(self, text):
-                if not text:
-                    return
-                    
-                self.buffer += text
-                # Flush on newline
-                if '\n' in text:
-                    lines = self.buffer.split('\n')
-                    self.buffer = lines[-1]  # Keep incomplete line
-                    for line in lines[:-1]:
-                        if line.strip():  # Only process non-empty lines
-                            if self.log_callback:
-                                self.log_callback(line + '\n')
-                            
-                            # Parse progress in real-time
-                            if self.progress_callback and "Progress:" in line:
-                                try:
-                                    parts = line.split("Progress:")
-                                    if len(parts) > 1:
-                                        percent_part = parts[1].split("%")[0].strip()
-                                        percent = float(percent_part)
-                                        
-                                        # Extract counts
-                                        processed = None
-                                        unique = None
-                                        if "Processed:" in line and "Unique:" in line:
-                                            try:
-                                                proc_part = line.split("Processed:")[1].split(",")[0].strip()
-                                                unique_part = line.split("Unique:")[1].split()[0].strip()
-                                                processed = int(proc_part.replace(',', ''))
-                                                unique = int(unique_part.replace(',', ''))
-                                            except:
-                                                pass
-                                        
-                                        self.progress_callback(percent, processed, None, unique)
-                                except:
-                                    pass
-            
-            def flush(self):
-                pass  # No-op for flush
+        # Converter output goes to the log line by line; progress numbers
+        # arrive separately through progress_callback
+        def log_output(text):
+            # Blank lines are left out of the log
+            lines = ''.join(line + '\n' for line in text.split('\n') if line.strip())
+            if lines and log_callback:
+                log_callback(lines)
+        
+        from Shramko_Andrii_ply_to_colmap_converter import convert_ply_to_colmap
         
         stderr_capture = io.StringIO()
-        progress_writer = ProgressWriter(log_callback, progress_callback)
+        stats = {}
         
         try:
-            with contextlib.redirect_stdout(progress_writer), contextlib.redirect_stderr(stderr_capture):
-                success = convert_ply_to_colmap(str(ply_path), str(output_path))
-            
-            # Flush remaining buffer
-            if progress_writer.buffer and log_callback:
-                log_callback(progress_writer.buffer)
+            with contextlib.redirect_stderr(stderr_capture):
+                success = convert_ply_to_colmap(str(ply_path), str(output_path),
+                                                progress_callback=progress_callback, stats=stats,
+                                                log_callback=log_output)
             
             # Output stderr if any
             stderr_output = stderr_capture.getvalue()
@@ -197,21 +216,8 @@ def convert_ply_file_gui(ply_file_path, output_name="points3D.txt", log_callback
         
         if success:
             result["success"] = True
-            result["file_size_output"] = os.path.getsize(output_path) / (1024 * 1024)  # MB
-            
-            # Count points from output file (approximate)
-            try:
-                with open(output_path, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                    # First line with point count in header
-                    for line in lines:
-                        if "Number of points:" in line:
-                            parts = line.split("Number of points:")
-                            if len(parts) > 1:
-                                result["points_count"] = int(parts[1].split(",")[0].strip())
-                                break
-            except:
-                pass
+            result["file_size_output"] = stats["output_size"] / (1024 * 1024)  # MB
+            result["points_count"] = stats["points_count"]
             
             if log_callback:
                 log_callback("\n" + "=" * 70 + "\n")
@@ -243,59 +249,8 @@ def convert_ply_file_gui(ply_file_path, output_name="points3D.txt", log_callback
     
     return result
 
-class HelpWindow:
-    """Help window with CloudCompare instructions"""
-    
-    def __init__(self, parent):
-        self.parent = parent
-        self.window = tk.Toplevel(parent)
-        self.window.title("Help - How to Prepare PLY File in CloudCompare")
-        self.window.geometry("700x650")
-        self.window.resizable(True, True)
-        
-        # Make window modal
-        self.window.transient(parent)
-        self.window.grab_set()
-        
-        self.create_widgets()
-        
-        # Center window
-        self.window.update_idletasks()
-        x = (self.window.winfo_screenwidth() // 2) - (self.window.winfo_width() // 2)
-        y = (self.window.winfo_screenheight() // 2) - (self.window.winfo_height() // 2)
-        self.window.geometry(f"+{x}+{y}")
-    
-    def create_widgets(self):
-        """Creates help window widgets"""
-        # Main frame with padding
-        main_frame = tk.Frame(self.window, padx=15, pady=15)
-        main_frame.pack(fill=tk.BOTH, expand=True)
-        
-        # Title
-        title_label = tk.Label(
-            main_frame,
-            text="How to Prepare PLY File in CloudCompare",
-            font=("Arial", 14, "bold")
-        )
-        title_label.pack(pady=(0, 15))
-        
-        # Scrollable text area
-        text_frame = tk.Frame(main_frame)
-        text_frame.pack(fill=tk.BOTH, expand=True)
-        
-        help_text = scrolledtext.ScrolledText(
-            text_frame,
-            wrap=tk.WORD,
-            font=("Arial", 10),
-            bg="#ffffff",
-            fg="#333333",
-            padx=10,
-            pady=10
-        )
-        help_text.pack(fill=tk.BOTH, expand=True)
-        
-        # Help content
-        help_content = """
+# Text of the help window
+HELP_CONTENT = """
 PREPARING PLY FILE IN CLOUDCOMPARE
 
 This converter requires a PLY file exported from CloudCompare with specific settings.
@@ -360,8 +315,59 @@ If you encounter errors:
 
 Need more help? Consult AI assistants (ChatGPT, Claude, etc.) or check the GitHub repository.
 """
+
+class HelpWindow:
+    """Help window with CloudCompare instructions"""
+    
+    def __init__(self, parent):
+        self.parent = parent
+        self.window = tk.Toplevel(parent)
+        self.window.title("Help - How to Prepare PLY File in CloudCompare")
+        self.window.geometry("700x650")
+        self.window.resizable(True, True)
+        
+        # Make window modal
+        self.window.transient(parent)
+        self.window.grab_set()
+        
+        self.create_widgets()
+        
+        # Center window
+        self.window.update_idletasks()
+        x = (self.window.winfo_screenwidth() // 2) - (self.window.winfo_width() // 2)
+        y = (self.window.winfo_screenheight() // 2) - (self.window.winfo_height() // 2)
+        self.window.geometry(f"+{x}+{y}")
+    
+    def create_widgets(self):
+        """Creates help window widgets"""
+        # Main frame with padding
+        main_frame = tk.Frame(self.window, padx=15, pady=15)
+        main_frame.pack(fill=tk.BOTH, expand=True)
+        
+        # Title
+        title_label = tk.Label(
+            main_frame,
+            text="How to Prepare PLY File in CloudCompare",
+            font=("Arial", 14, "bold")
+        )
+        title_label.pack(pady=(0, 15))
+        
+        # Scrollable text area
+        text_frame = tk.Frame(main_frame)
+        text_frame.pack(fill=tk.BOTH, expand=True)
+        
+        help_text = scrolledtext.ScrolledText(
+            text_frame,
+            wrap=tk.WORD,
+            font=("Arial", 10),
+            bg="#ffffff",
+            fg="#333333",
+            padx=10,
+            pady=10
+        )
+        help_text.pack(fill=tk.BOTH, expand=True)
         
-        help_text.insert(tk.END, help_content)
+        help_text.insert("1.0", HELP_CONTENT)
         help_text.config(state=tk.DISABLED)  # Make read-only
         
         # Close button
@@ -518,6 +524,7 @@ class PLYConverterGUI:
         # Load configuration
         self.config = load_config()
         self.current_file_path = self.config.get("last_path", "")
+        self._pending_save = None
         
         # Create interface
         self.create_menu()
@@ -526,6 +533,17 @@ class PLYConverterGUI:
         # Update interface with loaded path
         if self.current_file_path:
             self.file_path_var.set(self.current_file_path)
+        
+        # Messages from the conversion thread, applied by _poll_updates
+        self._log_queue = queue.Queue()
+        self._progress_state = None
+        self._progress_lock = threading.Lock()  # Guards _progress_state
+        self.root.after(UI_POLL_INTERVAL, self._poll_updates)
+        
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+        # Import the converter in the background while a file is being selected
+        threading.Thread(target=preload_converter, daemon=True).start()
     
     def create_menu(self):
         """Creates menu bar"""
@@ -611,6 +629,7 @@ class PLYConverterGUI:
         
         # Progress label
         self.progress_label_var = tk.StringVar(value="")
+        self._progress_label_text = ""
         progress_label = tk.Label(
             progress_frame,
             textvariable=self.progress_label_var,
@@ -679,72 +698,110 @@ class PLYConverterGUI:
             
             # Save path to configuration
             self.config["last_path"] = file_path
-            save_config(self.config)
+            self.schedule_config_save()
             
             self.log_text.insert(tk.END, f"File selected: {file_path}\n")
             self.log_text.see(tk.END)
             self.status_var.set(f"File selected: {Path(file_path).name}")
     
+    def schedule_config_save(self):
+        """Saves configuration after CONFIG_SAVE_DELAY, replacing an earlier pending save"""
+        if self._pending_save is not None:
+            self.root.after_cancel(self._pending_save)
+        self._pending_save = self.root.after(CONFIG_SAVE_DELAY, self._flush_config)
+    
+    def _flush_config(self):
+        """Writes a pending configuration change to disk"""
+        if self._pending_save is not None:
+            self.root.after_cancel(self._pending_save)
+            self._pending_save = None
+            save_config(self.config)
+    
+    def on_close(self):
+        """Saves pending configuration changes and closes the window"""
+        self._flush_config()
+        self.root.destroy()
+    
     def log_message(self, message):
         """Adds message to log (thread-safe)"""
-        self.root.after(0, self._log_message_safe, message)
+        self._log_queue.put(message)
+    
+    def _apply_updates(self):
+        """Applies queued log messages and the latest progress (main thread)"""
+        batch = []
+        try:
+            while len(batch) < 1000:
+                batch.append(self._log_queue.get_nowait())
+        except queue.Empty:
+            pass
+        if batch:
+            self._log_message_safe("".join(batch))
+        
+        # Only the most recent progress matters; it is taken and cleared in one
+        # step so an update from the conversion thread cannot be lost in between
+        with self._progress_lock:
+            state, self._progress_state = self._progress_state, None
+        if state is not None:
+            self._update_progress_safe(*state)
+    
+    def _poll_updates(self):
+        """Applies updates from the conversion thread periodically"""
+        self._apply_updates()
+        self.root.after(UI_POLL_INTERVAL, self._poll_updates)
     
     def _log_message_safe(self, message):
         """Safe message addition to log from main thread"""
         self.log_text.insert(tk.END, message)
-        self.log_text.see(tk.END)
         
-        # Try to extract progress from message
-        if "Progress:" in message:
-            try:
-                # Extract percentage from "Progress: 45.2%"
-                parts = message.split("Progress:")
-                if len(parts) > 1:
-                    percent_str = parts[1].split("%")[0].strip()
-                    percent = float(percent_str)
-                    self.update_progress(percent)
-            except:
-                pass
+        # Drop the oldest lines so the log does not grow without limit
+        line_count = int(self.log_text.index('end-1c').split('.')[0])
+        if line_count > MAX_LOG_LINES:
+            self.log_text.delete('1.0', f'{line_count - MAX_LOG_LINES + 1}.0')
+        self.log_text.see(tk.END)
     
     def update_progress(self, percent, processed=None, total=None, unique=None):
         """Updates progress bar (thread-safe)"""
-        self.root.after(0, self._update_progress_safe, percent, processed, total, unique)
+        with self._progress_lock:
+            self._progress_state = (percent, processed, total, unique)
     
     def _update_progress_safe(self, percent, processed, total, unique):
         """Safe progress update from main thread"""
         self.progress_var.set(percent)
         
-        # Update progress label
-        if processed is not None and total is not None:
-            # Calculate ETA
-            if self.progress_start_time is None:
-                self.progress_start_time = time.time()
-                self.last_progress_update = percent
-            
-            if percent > 0 and percent > self.last_progress_update:
-                elapsed = time.time() - self.progress_start_time
-                if percent > 0:
-                    estimated_total = elapsed / (percent / 100.0)
-                    remaining = estimated_total - elapsed
-                    
-                    if remaining > 60:
-                        eta_str = f"{int(remaining / 60)}m {int(remaining % 60)}s"
-                    else:
-                        eta_str = f"{int(remaining)}s"
-                    
-                    self.progress_label_var.set(f"{percent:.1f}% | ETA: {eta_str}")
-                    self.last_progress_update = percent
-                else:
-                    self.progress_label_var.set(f"{percent:.1f}%")
-            else:
-                self.progress_label_var.set(f"{percent:.1f}%")
+        if processed is None or total is None:
+            self._set_progress_label(f"{percent:.1f}%")
+            return
+        
+        if self.progress_start_time is None:
+            self.progress_start_time = time.time()
+            self.last_progress_update = percent
+            self._set_progress_label(f"{percent:.1f}%")
+            return
+        
+        # The ETA is only recalculated when the bar has visibly moved
+        if percent - self.last_progress_update < ETA_MIN_STEP:
+            return
+        
+        elapsed = time.time() - self.progress_start_time
+        remaining = elapsed * (100.0 - percent) / percent
+        if remaining > 60:
+            eta_str = f"{int(remaining / 60)}m {int(remaining % 60)}s"
         else:
-            self.progress_label_var.set(f"{percent:.1f}%")
+            eta_str = f"{int(remaining)}s"
+        
+        self._set_progress_label(f"{percent:.1f}% | ETA: {eta_str}")
+        self.last_progress_update = percent
+    
+    def _set_progress_label(self, text):
+        """Sets the progress label text if it changed"""
+        if text != self._progress_label_text:
+            self._progress_label_text = text
+            self.progress_label_var.set(text)
     
     def reset_progress(self):
         """Resets progress bar"""
         self.progress_var.set(0)
-        self.progress_label_var.set("")
+        self._set_progress_label("")
         self.progress_start_time = None
         self.last_progress_update = 0
     
@@ -794,11 +851,12 @@ class PLYConverterGUI:
     def conversion_complete(self, result):
         """Handles conversion completion"""
         self.convert_button.config(state=tk.NORMAL)
+        self._apply_updates()  # Show the rest of the log first
         
         # Set progress to 100% on completion
         if result["success"]:
-            self.update_progress(100.0)
-            self.progress_label_var.set("100% | Complete")
+            self._update_progress_safe(100.0, None, None, None)
+            self._set_progress_label("100% | Complete")
             self.status_var.set("✅ Conversion completed successfully!")
             messagebox.showinfo(
                 "Success",
@@ -809,7 +867,7 @@ class PLYConverterGUI:
                 f"Output file size: {result['file_size_output']:.1f} MB"
             )
         else:
-            self.progress_label_var.set("Failed")
+            self._set_progress_label("Failed")
             self.status_var.set("❌ Conversion error")
             error_msg = result.get("error", "Unknown error")
             messagebox.showerror("Error", f"Error during conversion:\n\n{error_msg}")
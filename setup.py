@@ -1,59 +1,59 @@
 #!/usr/bin/env python3
 """
 Setup script for PLY to COLMAP Converter
+
+Project metadata lives in pyproject.toml; this script only adds what
+cannot be declared there: the optional Cython extension and the
+dependencies from requirements.txt (frozen into _requirements.py).
 """
 
-from setuptools import setup, find_packages
-import os
+import sys
+import functools
+from pathlib import Path
 
-# Read README file
-def read_readme():
-    with open("README.md", "r", encoding="utf-8") as fh:
-        return fh.read()
+# Files are read relative to this script, not the current directory
+HERE = Path(__file__).resolve().parent
 
 # Read requirements
+@functools.lru_cache(maxsize=1)
 def read_requirements():
-    with open("requirements.txt", "r", encoding="utf-8") as fh:
-        return [line.strip() for line in fh if line.strip() and not line.startswith("#")]
+    # Read as bytes in one call and decoded without newline translation;
+    # splitlines() handles any line endings
+    text = (HERE / "requirements.txt").read_bytes().decode("utf-8")
+    return tuple(s for line in text.splitlines() if (s := line.strip()) and not s.startswith("#"))
+
+# Requirements frozen by tools/freeze_requirements.py (requirements.txt
+# is only parsed if _requirements.py is missing)
+def load_requirements():
+    sys.path.insert(0, str(HERE))
+    try:
+        from _requirements import REQUIREMENTS
+    except ImportError:
+        return read_requirements()
+    finally:
+        sys.path.remove(str(HERE))
+    return REQUIREMENTS
+
+def main():
+    # setuptools (and Cython) are only imported when the script is run, so
+    # importing setup.py for its helpers stays cheap
+    from setuptools import setup, Extension
+    
+    # Optional compiled kernels - the converter falls back to numpy/Python without them.
+    # The extension is skipped without Cython, and if there is no C compiler.
+    try:
+        from Cython.Build import cythonize
+        ext_modules = cythonize([Extension("_ply_core", ["_ply_core.pyx"])], language_level=3)
+        for extension in ext_modules:
+            extension.optional = True  # Not carried over by cythonize
+    except ImportError:
+        ext_modules = []
+    
+    # All other metadata is declared in pyproject.toml
+    setup(
+        ext_modules=ext_modules,
+        install_requires=load_requirements(),
+    )
 
-setup(
-    name="ply-to-colmap-converter",
-    version="1.0.0",
-    author="AI Assistant",
-    author_email="",
-    description="Convert PLY dense point clouds from CloudCompare to COLMAP format for Postshot 3D Gaussian Splatting",
-    long_description=read_readme(),
-    long_description_content_type="text/markdown",
-    url="https://github.com/yourusername/ply-to-colmap-converter",
-    packages=find_packages(),
-    classifiers=[
-        "Development Status :: 5 - Production/Stable",
-        "Intended Audience :: Developers",
-        "Intended Audience :: Science/Research",
-        "License :: OSI Approved :: MIT License",
-        "Operating System :: OS Independent",
-        "Programming Language :: Python :: 3",
-        "Programming Language :: Python :: 3.6",
-        "Programming Language :: Python :: 3.7",
-        "Programming Language :: Python :: 3.8",
-        "Programming Language :: Python :: 3.9",
-        "Programming Language :: Python :: 3.10",
-        "Programming Language :: Python :: 3.11",
-        "Programming Language :: Python :: 3.12",
-        "Topic :: Scientific/Engineering :: Image Processing",
-        "Topic :: Multimedia :: Graphics :: 3D Modeling",
-    ],
-    python_requires=">=3.6",
-    install_requires=read_requirements(),
-    entry_points={
-        "console_scripts": [
-            "shramko-andrii-ply-to-colmap=Shramko_Andrii_ply_to_colmap_converter:main",
-        ],
-    },
-    keywords="ply colmap point-cloud 3d-gaussian-splatting postshot cloudcompare",
-    project_urls={
-        "Bug Reports": "https://github.com/yourusername/ply-to-colmap-converter/issues",
-        "Source": "https://github.com/yourusername/ply-to-colmap-converter",
-        "Documentation": "https://github.com/yourusername/ply-to-colmap-converter#readme",
-    },
-)
+if __name__ == "__main__":
+    main()
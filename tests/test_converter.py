@@ -0,0 +1,161 @@
+"""
+Tests for Shramko_Andrii_ply_to_colmap_converter
+
+Run: python -m unittest discover -s tests  (or pytest)
+"""
+
+import io
+import os
+import struct
+import sys
+import tempfile
+import unittest
+from contextlib import nullcontext, redirect_stderr
+from pathlib import Path
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import Shramko_Andrii_ply_to_colmap_converter as converter
+
+
+def write_binary_ply(path, points, color_type):
+    """Writes (x, y, z, r, g, b) points as a little-endian PLY with float coordinates"""
+    header = (
+        "ply\n"
+        "format binary_little_endian 1.0\n"
+        f"element vertex {len(points)}\n"
+        "property float x\n"
+        "property float y\n"
+        "property float z\n"
+        f"property {color_type} red\n"
+        f"property {color_type} green\n"
+        f"property {color_type} blue\n"
+        "end_header\n"
+    )
+    color = converter.STRUCT_TYPES[color_type]
+    vertex = struct.Struct(f"<fff{color * 3}")
+    with open(path, 'wb') as f:
+        f.write(header.encode('ascii'))
+        for point in points:
+            f.write(vertex.pack(*point))
+
+
+def read_points(path):
+    """Returns the points3D.txt lines without their POINT3D_ID"""
+    with open(path) as f:
+        return [line.split(' ', 1)[1] for line in f if not line.startswith('#')]
+
+
+def convert(ply_file, output_file, **kwargs):
+    """Runs convert_ply_to_colmap without printing its log"""
+    return converter.convert_ply_to_colmap(str(ply_file), str(output_file),
+                                           log_callback=lambda message: None, **kwargs)
+
+
+@unittest.skipIf(converter.np is None, "requires numpy")
+class ChunkedColorTest(unittest.TestCase):
+    """Chunked mode must write the same colors as the in-memory path"""
+
+    def check_colors(self, color_type, colors):
+        points = [(i * 0.5, -i * 0.25, 1.0, *color) for i, color in enumerate(colors)]
+        points += points[:3]  # Duplicates
+        with tempfile.TemporaryDirectory() as tmp:
+            ply_file = Path(tmp) / "colors.ply"
+            write_binary_ply(ply_file, points, color_type)
+            self.assertTrue(convert(ply_file, Path(tmp) / "memory.txt"))
+            self.assertTrue(convert(ply_file, Path(tmp) / "chunked.txt", chunk_size=4))
+            expected = read_points(Path(tmp) / "memory.txt")
+            self.assertEqual(len(expected), len(colors))
+            self.assertEqual(sorted(read_points(Path(tmp) / "chunked.txt")), sorted(expected))
+
+    def test_negative_colors(self):
+        self.check_colors('char', [(-44, 0, 127), (-128, -1, 5), (3, -44, -44), (1, 2, 3), (-1, -1, -1)])
+
+    def test_wide_colors(self):
+        self.check_colors('int', [(70000, 0, 1), (4464, 0, 1), (-70000, 2 ** 31 - 1, -2 ** 31), (1, 2, 3), (65536, 0, 0)])
+
+
+class DedupBackendTest(unittest.TestCase):
+    """Every duplicate removal backend must keep the same points"""
+
+    # Colors 65536 apart are different points
+    POINTS = [(1.0, 2.0, 3.0, 1, 2, 3), (1.0, 2.0, 3.0, 65537, 2, 3), (1.0, 2.0, 3.0, 1, 2, 3),
+              (1.0, 2.0, 3.0, 1, -65534, 3), (0.5, 0.5, 0.5, 0, 0, 0), (0.5, 0.5, 0.5, 0, 0, 65536)]
+
+    def convert_with(self, **patches):
+        with tempfile.TemporaryDirectory() as tmp:
+            ply_file = Path(tmp) / "colors.ply"
+            write_binary_ply(ply_file, self.POINTS, 'int')
+            with mock.patch.multiple(converter, **patches) if patches else nullcontext():
+                self.assertTrue(convert(ply_file, Path(tmp) / "points3D.txt"))
+            return read_points(Path(tmp) / "points3D.txt")
+
+    def test_backends_agree(self):
+        expected = self.convert_with(np=None)  # Pure Python
+        self.assertEqual(len(expected), 5)
+        if converter.np is not None:
+            self.assertEqual(self.convert_with(), expected)
+            self.assertEqual(self.convert_with(_first_occurrence_mask=None, _ply_core=None), expected)
+
+
+@unittest.skipIf(converter.np is None or converter.pyminiply is None, "requires numpy and pyminiply")
+class NativeReaderTest(unittest.TestCase):
+    """The pyminiply reader must give byte-identical output to the memory-mapped reader"""
+
+    def test_output_identical(self):
+        points = [(i * 0.1234567, -i * 3.3, 1e-7 * i, i % 256, (7 * i) % 256, 255) for i in range(1000)]
+        points += points[::7]  # Duplicates
+        with tempfile.TemporaryDirectory() as tmp:
+            ply_file = Path(tmp) / "native.ply"
+            write_binary_ply(ply_file, points, 'uchar')
+            with open(ply_file, 'rb') as f:
+                header_info = converter.read_ply_header(f)
+            self.assertIsNotNone(converter.load_native_vertices(ply_file, header_info, ('x', 'y', 'z'),
+                                                                ('red', 'green', 'blue')))
+
+            self.assertTrue(convert(ply_file, Path(tmp) / "native.txt"))
+            with mock.patch.object(converter, 'pyminiply', None):
+                self.assertTrue(convert(ply_file, Path(tmp) / "memmap.txt"))
+            self.assertEqual((Path(tmp) / "native.txt").read_bytes(), (Path(tmp) / "memmap.txt").read_bytes())
+
+    def test_other_types_not_used(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            ply_file = Path(tmp) / "wide.ply"
+            write_binary_ply(ply_file, [(1.0, 2.0, 3.0, 70000, 0, 0)], 'int')
+            with open(ply_file, 'rb') as f:
+                header_info = converter.read_ply_header(f)
+            self.assertIsNone(converter.load_native_vertices(ply_file, header_info, ('x', 'y', 'z'),
+                                                             ('red', 'green', 'blue')))
+
+
+class ArgumentTest(unittest.TestCase):
+    """Counts given on the command line must be positive"""
+
+    def assert_rejected(self, *args):
+        with mock.patch.object(sys, 'argv', ['ply-to-colmap', 'missing.ply', *args]), \
+                redirect_stderr(io.StringIO()) as stderr:
+            with self.assertRaises(SystemExit) as exit_info:
+                converter.main()
+        self.assertEqual(exit_info.exception.code, 2)
+        self.assertIn("must be a positive integer", stderr.getvalue())
+
+    def test_chunk_size_rejected(self):
+        self.assert_rejected('--chunk-size', '0')
+        self.assert_rejected('--chunk-size', '-5')
+
+    def test_chunk_size_value_error(self):
+        with self.assertRaises(ValueError):
+            converter.convert_ply_to_colmap(os.devnull, chunk_size=-5)
+
+    def test_workers_rejected(self):
+        self.assert_rejected('--workers', '0')
+        self.assert_rejected('--workers', '-3')
+
+    def test_workers_value_error(self):
+        with self.assertRaises(ValueError):
+            converter.convert_ply_to_colmap(os.devnull, workers=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
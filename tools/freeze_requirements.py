@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Writes _requirements.py from requirements.txt
+
+setup.py installs the list frozen in _requirements.py, so requirements.txt
+is not parsed on every build. Run this after changing requirements.txt:
+
+    python tools/freeze_requirements.py
+"""
+
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from setup import read_requirements
+
+OUTPUT_FILE = ROOT / "_requirements.py"
+
+def main():
+    requirements = read_requirements()
+    OUTPUT_FILE.write_text(
+        '"""Generated by tools/freeze_requirements.py from requirements.txt - do not edit"""\n'
+        "\n"
+        f"REQUIREMENTS = {requirements!r}\n",
+        encoding="utf-8"
+    )
+    print(f"Wrote {len(requirements)} requirement(s) to {OUTPUT_FILE.name}")
+
+if __name__ == "__main__":
+    main()